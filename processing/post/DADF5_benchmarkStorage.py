@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+import tempfile
+import time
+import argparse
+
+import h5py
+
+import damask
+
+scriptName = os.path.splitext(os.path.basename(__file__))[0]
+scriptID   = ' '.join([scriptName,damask.version])
+
+policies = {
+            'gzip-6':           {'compression':'gzip','level':6,'checksum':True},
+            'gzip-1':           {'compression':'gzip','level':1,'checksum':False},
+            'lzf':              {'compression':'lzf','checksum':False},
+            'lzf (component)':  {'compression':'lzf','checksum':False,'layout':'component'},
+            'blosc':            {'compression':'blosc','checksum':False},
+            'lz4':              {'compression':'lz4','checksum':False},
+            'none':             {'compression':None,'checksum':False},
+           }
+
+# --------------------------------------------------------------------
+#                                MAIN
+# --------------------------------------------------------------------
+parser = argparse.ArgumentParser(description='Compare storage policies of damask.Result for writing and reading.')
+
+parser.add_argument('filename',
+                    help='DADF5 file')
+parser.add_argument('-l','--labels', nargs='+', default=['F','P'],
+                    help='labels of datasets to write and read [%(default)s]')
+parser.add_argument('-p','--policies', nargs='+', default=list(policies), choices=list(policies),
+                    help='storage policies to compare [all]')
+
+options = parser.parse_args()
+
+table = []
+for policy in options.policies:
+    try:
+        if policies[policy]['compression'] in ['blosc','lz4']: import hdf5plugin                   # noqa
+    except ImportError:
+        print(f'skipping {policy}: requires hdf5plugin')
+        continue
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(options.filename))) as tmp:
+        fname = os.path.join(tmp,os.path.basename(options.filename))
+        shutil.copy(options.filename,fname)
+        size = os.path.getsize(fname)
+
+        results = damask.Result(fname)
+        results.set_storage(**policies[policy])
+        tic = time.perf_counter()
+        for label in options.labels:
+            results.add_calculation(f'{label}_copy',f'#{label}#')
+        t_write = time.perf_counter()-tic
+
+        paths = [p for label in options.labels for p in results.get_dataset_location(f'{label}_copy')]
+        with h5py.File(fname,'r') as f:
+            tic = time.perf_counter()
+            for p in paths: f[p][()]
+            t_read = time.perf_counter()-tic
+            tic = time.perf_counter()
+            for p in paths: f[p][(slice(None),)+(0,)*(len(f[p].shape)-1)]
+            t_component = time.perf_counter()-tic
+
+        table.append([policy,t_write,t_read,t_component,(os.path.getsize(fname)-size)/2**20])
+
+print(f'{"policy":<20}{"write/s":>10}{"read/s":>10}{"component/s":>14}{"size/MiB":>10}')
+for row in table:
+    print(f'{row[0]:<20}'+''.join(f'{v:{w}.3f}' for v,w in zip(row[1:],[10,10,14,10])))
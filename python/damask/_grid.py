@@ -1,6 +1,5 @@
 import copy
-import multiprocessing as mp
-from functools import partial
+from multiprocessing.pool import ThreadPool
 import os
 import warnings
 
@@ -318,8 +317,31 @@ class Grid:
 
 
     @staticmethod
-    def _find_closest_seed(seeds, weights, point):
-        return np.argmin(np.sum((np.broadcast_to(point,(len(seeds),3))-seeds)**2,axis=1) - weights)
+    def _tessellate(cells,size,closest_seed,dtype=int,N_slab=2**18):
+        """
+        Assign cells to seeds slab-wise.
+
+        Parameters
+        ----------
+        cells : int numpy.ndarray of shape (3)
+            Number of cells in x,y,z direction.
+        size : numpy.ndarray of shape (3)
+            Physical size of the grid in meter.
+        closest_seed : callable
+            Index of the closest seed for points of shape (:,3).
+        dtype : numpy.dtype, optional
+            Integer data type of the seed indices. Defaults to int.
+        N_slab : int, optional
+            Approximate number of cells per slab. Defaults to 2^18.
+
+        """
+        material = np.empty(cells,dtype=dtype)
+        slab = max(1,N_slab//np.prod(cells[1:]))
+        for x in range(0,cells[0],slab):
+            cells_ = np.array([min(slab,cells[0]-x),cells[1],cells[2]])
+            coords = grid_filters.coordinates0_point(cells_,size/cells*cells_,size/cells*np.array([x,0,0]))
+            material[x:x+cells_[0]] = closest_seed(coords.reshape(-1,3)).reshape(cells_)
+        return material
 
     @staticmethod
     def from_Laguerre_tessellation(cells,size,seeds,weights,material=None,periodic=True):
@@ -343,28 +365,20 @@ class Grid:
             Assume grid to be periodic. Defaults to True.
 
         """
+        weights_ = np.array(weights,dtype=float)
+        active = np.flatnonzero(weights_ > -np.inf)                                                 # seeds with infinitely small weight never win
+        seeds_ = np.array(seeds,dtype=float)[active]
         if periodic:
-            weights_p = np.tile(weights,27)                                                         # Laguerre weights (1,2,3,1,2,3,...,1,2,3)
-            seeds_p = np.vstack((seeds  -np.array([size[0],0.,0.]),seeds,  seeds  +np.array([size[0],0.,0.])))
-            seeds_p = np.vstack((seeds_p-np.array([0.,size[1],0.]),seeds_p,seeds_p+np.array([0.,size[1],0.])))
-            seeds_p = np.vstack((seeds_p-np.array([0.,0.,size[2]]),seeds_p,seeds_p+np.array([0.,0.,size[2]])))
-            coords  = grid_filters.coordinates0_point(cells*3,size*3,-size).reshape(-1,3)
-        else:
-            weights_p = weights
-            seeds_p   = seeds
-            coords    = grid_filters.coordinates0_point(cells,size).reshape(-1,3)
+            images = np.array(np.meshgrid(*[[-1,0,1]]*3,indexing='ij')).reshape(3,-1).T*size
+            seeds_ = (seeds_+images[:,np.newaxis]).reshape(-1,3)                                    # periodic images of the seeds
+        weights_ = np.tile(weights_[active],len(seeds_)//len(active))
 
-        pool = mp.Pool(int(os.environ.get('OMP_NUM_THREADS',1)))
-        result = pool.map_async(partial(Grid._find_closest_seed,seeds_p,weights_p), [coord for coord in coords])
-        pool.close()
-        pool.join()
-        material_ = np.array(result.get())
-
-        if periodic:
-            material_ = material_.reshape(cells*3)
-            material_ = material_[cells[0]:cells[0]*2,cells[1]:cells[1]*2,cells[2]:cells[2]*2]%seeds.shape[0]
-        else:
-            material_ = material_.reshape(cells)
+        # power distance |x-s|^2-w equals squared distance of (x,0) and (s,sqrt(max(w)-w)) minus max(w)
+        KDTree = spatial.cKDTree(np.hstack((seeds_,np.sqrt(weights_.max()-weights_)[:,np.newaxis])))
+        material_ = active[Grid._tessellate(np.array(cells),np.array(size,dtype=float),
+                                            lambda x: KDTree.query(np.hstack((x,np.zeros((len(x),1)))),
+                                                                   workers=int(os.environ.get('OMP_NUM_THREADS',1)))[1]
+                                           )%len(active)]
 
         return Grid(material = material_ if material is None else material[material_],
                     size     = size,
@@ -392,11 +406,12 @@ class Grid:
             Assume grid to be periodic. Defaults to True.
 
         """
-        coords = grid_filters.coordinates0_point(cells,size).reshape(-1,3)
         KDTree = spatial.cKDTree(seeds,boxsize=size) if periodic else spatial.cKDTree(seeds)
-        devNull,material_ = KDTree.query(coords)
+        material_ = Grid._tessellate(np.array(cells),np.array(size,dtype=float),
+                                     lambda x: KDTree.query(x,workers=int(os.environ.get('OMP_NUM_THREADS',1)))[1],
+                                     np.min_scalar_type(-len(seeds)))
 
-        return Grid(material = (material_ if material is None else material[material_]).reshape(cells),
+        return Grid(material = material_.astype(int) if material is None else material[material_].reshape(cells),
                     size     = size,
                     comments = util.execution_stamp('Grid','from_Voronoi_tessellation'),
                    )
@@ -715,21 +730,29 @@ class Grid:
             Assume grid to be periodic. Defaults to True.
 
         """
-        def mostFrequent(arr,selection=None):
-            me = arr[arr.size//2]
-            if selection is None or me in selection:
-                unique, inverse = np.unique(arr, return_inverse=True)
-                return unique[np.argmax(np.bincount(inverse))]
-            else:
-                return me
-
-        return Grid(material = ndimage.filters.generic_filter(
-                                                               self.material,
-                                                               mostFrequent,
-                                                               size=(stencil if selection is None else stencil//2*2+1,)*3,
-                                                               mode=('wrap' if periodic else 'nearest'),
-                                                               extra_keywords=dict(selection=selection),
-                                                              ).astype(self.material.dtype),
+        def most_frequent(windows):
+            """Smallest of the most frequent values in each row."""
+            w = np.sort(windows,axis=1)
+            i = np.broadcast_to(np.arange(w.shape[1]),w.shape)
+            start = np.maximum.accumulate(np.where(np.pad(w[:,1:]!=w[:,:-1],((0,0),(1,0)),constant_values=True),i,0),axis=1)
+            return w[np.arange(w.shape[0]),np.argmax(i-start,axis=1)]
+
+        size = stencil if selection is None else stencil//2*2+1
+        unique,inverse = np.unique(self.material,return_inverse=True)
+        inverse = inverse.reshape(self.cells).astype(np.min_scalar_type(unique.size))
+        padded = np.pad(inverse,(size//2,size-size//2-1),'wrap' if periodic else 'edge')
+        windows = np.lib.stride_tricks.as_strided(padded,tuple(self.cells)+(size,)*3,padded.strides*2,
+                                                  writeable=False)                                  # sliding_window_view requires numpy 1.20
+
+        slab = max(1,2**22//(size**3*np.prod(self.cells[1:])))
+        with ThreadPool(int(os.environ.get('OMP_NUM_THREADS',1))) as pool:
+            material = np.concatenate(pool.map(lambda x: most_frequent(windows[x:x+slab].reshape(-1,size**3)),
+                                               range(0,self.cells[0],slab))).reshape(self.cells)
+
+        if selection is not None:
+            material = np.where(np.isin(unique,selection)[inverse],material,inverse)
+
+        return Grid(material = unique[material].astype(self.material.dtype),
                     size     = self.size,
                     origin   = self.origin,
                     comments = self.comments+[util.execution_stamp('Grid','clean')],
@@ -1,13 +1,20 @@
 import multiprocessing as mp
+import ast
 import re
 import glob
 import os
+import sys
 import datetime
+import time
+import tempfile
+import weakref
+import threading
+from queue import Queue, Full
 import xml.etree.ElementTree as ET
 import xml.dom.minidom
 from pathlib import Path
-from functools import partial
-from collections import defaultdict
+from collections import defaultdict, deque
+from contextlib import contextmanager
 
 import h5py
 import numpy as np
@@ -29,6 +36,7 @@ class Result:
     Read and write to DADF5 files.
 
     DADF5 (DAMASK HDF5) files contain DAMASK results.
+    Use as context manager to keep the file open for reading.
     """
 
     def __init__(self,fname):
@@ -80,6 +88,10 @@ class Result:
                 self.out_type_ho += f['/'.join([self.increments[0],'homogenization',m])].keys()
             self.out_type_ho = list(set(self.out_type_ho))                                          # make unique
 
+            self._index = {}
+            for inc in self.increments:
+                self._index_increment(f,inc)
+
         self.visible = {'increments':      self.increments,
                         'phases':          self.phases,
                         'homogenizations': self.homogenizations,
@@ -88,8 +100,36 @@ class Result:
                        }
 
         self.fname = Path(fname).absolute()
+        self._index_stamp = self._file_stamp()
 
         self._allow_modification = False
+        self._attributes = {}
+        self._handle = None
+        self._pool = None
+        self._batch = None
+        self._mapping = None
+        self._slab_length = 2**18                                                                   # multiple of HDF5 chunk length
+        self.set_storage()
+
+
+    def __enter__(self):
+        """Keep the file open for reading until the context is left."""
+        if self._handle is None:
+            self._handle = h5py.File(self.fname,'r')
+        return self
+
+
+    def __exit__(self,*exc):
+        """Close the file."""
+        self.close()
+
+
+    def __getstate__(self):
+        """Exclude the (not picklable) file handle and worker pool, e.g. for sending to worker processes."""
+        state = self.__dict__.copy()
+        state['_handle'] = None
+        state['_pool']   = None
+        return state
 
 
     def __repr__(self):
@@ -110,6 +150,221 @@ class Result:
         return util.srepr(first + in_between + last)
 
 
+    def close(self):
+        """Close the file handle kept open by using Result as context manager and the worker pool."""
+        self._close_handle()
+        self._close_pool()
+
+
+    def _close_pool(self):
+        """Close the worker pool and wait for the workers to exit."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+
+    def _close_handle(self):
+        """Close the persistent file handle."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+    def _get_pool(self):
+        """
+        Get the pool of worker processes.
+
+        The pool is created on first use and reused afterwards.
+        Its size is determined by the environment variable OMP_NUM_THREADS.
+
+        """
+        if self._pool is None:
+            persistent = self._handle is not None
+            self._close_handle()                                                                    # forked processes must not inherit the file handle
+            self._pool = mp.Pool(int(os.environ.get('OMP_NUM_THREADS',1)))
+            weakref.finalize(self,self._pool.terminate)
+            if persistent: self.__enter__()
+        return self._pool
+
+
+    def _map_increments(self,job,paths,args,parallel):
+        """
+        Apply a job to items, one item per increment.
+
+        Parameters
+        ----------
+        job : callable
+            Function with signature job(result,paths,*args) returning one
+            result per increment in a sequence that supports concatenation.
+        paths : list
+            Items per increment, e.g. lists of dataset paths.
+        args : tuple
+            Additional arguments to job.
+        parallel : bool
+            Distribute the increments over the worker pool.
+
+        Returns
+        -------
+        results : list
+            Results of job in contiguous, increasing chunks of increments.
+
+        """
+        if not parallel:
+            return [job(self,paths,*args)]
+        pool = self._get_pool()
+        N = int(os.environ.get('OMP_NUM_THREADS',1))
+        bounds = np.linspace(0,len(paths),min(N,len(paths))+1).astype(int)
+        return pool.starmap(job,[(self,paths[b:e])+tuple(args) for b,e in zip(bounds[:-1],bounds[1:])])
+
+
+    @contextmanager
+    def _open(self,mode='r'):
+        """
+        Open the DADF5 file.
+
+        For reading, the persistent handle is used if available.
+        For writing, the persistent handle is temporarily closed.
+        Nested calls reuse the outermost handle if possible.
+
+        Parameters
+        ----------
+        mode : str, optional
+            File mode, either 'r' or 'a'. Defaults to 'r'.
+
+        """
+        if self._handle is not None and (mode == 'r' or self._handle.mode == 'r+'):
+            yield self._handle
+        else:
+            persistent = self._handle is not None
+            self._close_handle()
+            try:
+                with h5py.File(self.fname,mode) as f:
+                    self._handle = f
+                    yield f
+            finally:
+                self._handle = None
+                if mode != 'r':
+                    self._index_stamp = self._file_stamp()                                          # own writes are indexed
+                    if self._mapping is not None:
+                        self._mapping_stamp = self._file_stamp()                                    # own writes do not alter the mapping
+                if persistent: self._handle = h5py.File(self.fname,'r')
+
+
+    def _file_stamp(self):
+        """Modification time and size of the file to detect changes."""
+        stat = os.stat(self.fname)
+        return (stat.st_mtime_ns,stat.st_size)
+
+
+    @staticmethod
+    def _read_mapping(f):
+        """
+        Decode the mapping of material points to phases and homogenizations.
+
+        Parameters
+        ----------
+        f : h5py.File
+            Opened DADF5 file.
+
+        Returns
+        -------
+        mapping : dict
+            Indices of the material points and positions in the respective datasets.
+            Keys are ('phase',name,constituent) and ('homogenization',name).
+
+        """
+        mapping = {}
+        for ty in ['phase','homogenization']:
+            table = f[f'mapping/{ty}'][()]
+            table = table.reshape(table.shape[0],-1)                                                # homogenization mapping is 1D
+            for c in range(table.shape[1]):
+                names,inverse = np.unique(table['Name'][:,c],return_inverse=True)
+                points = np.split(np.argsort(inverse,kind='stable'),np.cumsum(np.bincount(inverse))[:-1])
+                for name,p in zip(names,points):
+                    key = (ty,name.decode(),c) if ty == 'phase' else (ty,name.decode())
+                    mapping[key] = (p,table['Position'][p,c])
+        return mapping
+
+
+    def _get_mapping(self):
+        """
+        Get the decoded mapping of material points.
+
+        The mapping is read once and cached until the file is modified
+        by another process.
+
+        """
+        if self._mapping is None or self._mapping_stamp != self._file_stamp():
+            with self._open() as f:
+                self._mapping = self._read_mapping(f)
+            self._mapping_stamp = self._file_stamp()
+        return self._mapping
+
+
+    def _get_index(self):
+        """
+        Get the index of the datasets.
+
+        The index is rebuilt if the file was modified by another
+        process or Result instance.
+
+        """
+        if self._index_stamp != self._file_stamp() and \
+           (self._handle is None or self._handle.mode == 'r'):                                     # not while writing
+            with self._open() as f:
+                self._index = {}
+                for inc in self.increments:
+                    self._index_increment(f,inc)
+            self._attributes = {}
+            self._index_stamp = self._file_stamp()
+        return self._index
+
+
+    def _index_increment(self,f,inc):
+        """
+        Add shape and datatype of all datasets of an increment to the index.
+
+        Parameters
+        ----------
+        f : h5py.File
+            Opened DADF5 file.
+        inc : str
+            Name of the increment.
+
+        """
+        groups = [f'{inc}/geometry'] if f'{inc}/geometry' in f else []
+        for ty in ['phase','homogenization']:
+            for name in f[f'{inc}/{ty}'] if f'{inc}/{ty}' in f else []:
+                groups += ['/'.join([inc,ty,name,out]) for out in f['/'.join([inc,ty,name])]]
+        for group in groups:
+            self._index[group] = {d:(f[group][d].shape,f[group][d].dtype) for d in f[group]}
+
+
+    def _get_attributes(self,path):
+        """
+        Get all attributes of a dataset.
+
+        Attributes are read on first access and cached afterwards.
+
+        Parameters
+        ----------
+        path : str
+            Path to the dataset.
+
+        Returns
+        -------
+        attrs : dict
+            Decoded attributes.
+
+        """
+        if path not in self._attributes:
+            with self._open() as f:
+                self._attributes[path] = {k:(v if h5py3 or not isinstance(v,bytes) else v.decode())
+                                          for k,v in f[path].attrs.items()}
+        return self._attributes[path]
+
+
     def _manage_view(self,action,what,datasets):
         """
         Manages the visibility of the groups.
@@ -187,11 +442,10 @@ class Result:
             The requested attribute, None if not found.
 
         """
-        with h5py.File(self.fname,'r') as f:
-            try:
-                return f[path].attrs[attr] if h5py3 else f[path].attrs[attr].decode()
-            except KeyError:
-                return None
+        try:
+            return self._get_attributes(path)[attr]
+        except KeyError:
+            return None
 
 
     def allow_modification(self):
@@ -204,6 +458,47 @@ class Result:
         self._allow_modification = False
 
 
+    def set_storage(self,compression='gzip',level=None,checksum=True,layout='point'):
+        """
+        Set storage policy for datasets added to the file.
+
+        Only datasets larger than two chunks are chunked and compressed.
+
+        Parameters
+        ----------
+        compression : {'gzip', 'lzf', 'blosc', 'lz4', None}, optional
+            Compression filter. Defaults to 'gzip'.
+            'blosc' and 'lz4' require the hdf5plugin package for writing and reading.
+        level : int, optional
+            Compression level for 'gzip' (0-9, defaults to 6) and 'blosc' (0-9, defaults to 5).
+        checksum : bool, optional
+            Store Fletcher32 checksum. Defaults to True.
+        layout : {'point', 'component'}, optional
+            Chunk shape suited for reading all components of subsets of points ('point')
+            or individual components of all points ('component'). Defaults to 'point'.
+
+        """
+        if compression in ['blosc','lz4']:
+            try:
+                import hdf5plugin
+            except ImportError:
+                raise ImportError(f'compression "{compression}" requires hdf5plugin')
+            filters = dict(hdf5plugin.Blosc(cname='lz4',clevel=5 if level is None else level) if compression == 'blosc' else \
+                           hdf5plugin.LZ4())
+        elif compression == 'gzip':
+            filters = {'compression':'gzip','compression_opts':6 if level is None else level,'shuffle':True}
+        elif compression == 'lzf':
+            filters = {'compression':'lzf','shuffle':True}
+        elif compression is None:
+            filters = {}
+        else:
+            raise ValueError(f'invalid compression "{compression}"')
+        if layout not in ['point','component']:
+            raise ValueError(f'invalid layout "{layout}"')
+
+        self._storage = {'filters':{**filters,'fletcher32':checksum},'layout':layout}
+
+
     def incs_in_range(self,start,end):
         """
         Select all increments within a given range.
@@ -237,8 +532,8 @@ class Result:
 
         """
         selected = []
-        for i,time in enumerate(self.times):
-            if start <= time <= end:
+        for i,t in enumerate(self.times):
+            if start <= t <= end:
                 selected.append(self.times[i])
         return selected
 
@@ -265,6 +560,105 @@ class Result:
         self._manage_view('set',what,datasets)
 
 
+    def refresh(self):
+        """
+        Add increments written to the file after it was opened.
+
+        New increments are visible if all increments were visible before.
+        A persistent file handle (see 'with' statement) is reopened.
+
+        Returns
+        -------
+        increments : list of str
+            Names of the new increments.
+
+        """
+        if self._handle is not None:                                                                # open handle does not see new increments
+            self._close_handle()
+            self.__enter__()
+        with self._open() as f:
+            r=re.compile('inc[0-9]+')
+            increments_unsorted = {int(i[3:]):i for i in f.keys() if r.match(i) and i not in self.increments}
+            new = [increments_unsorted[i] for i in sorted(increments_unsorted)]
+            for inc in new:
+                self._index_increment(f,inc)
+            times = [round(f[i].attrs['time/s'],12) for i in new]
+
+        if self.visible['increments'] == self.increments:
+            self.visible['increments'] = self.visible['increments'] + new
+        self.increments = self.increments + new
+        self.times      = self.times + times
+        return new
+
+
+    def follow(self,interval=10.0,timeout=None):
+        """
+        Iterate over increments of a file that is still being written.
+
+        The increments in the file are yielded first, afterwards newly written
+        increments are yielded once the file has not been modified for the given
+        interval. While an iteration step is executed, only the yielded increments
+        are visible, i.e. add_* and other methods process only them.
+        A persistent file handle (see 'with' statement) is closed while waiting
+        for new increments to allow writing.
+
+        Parameters
+        ----------
+        interval : float, optional
+            Time in seconds between checks for new increments. Defaults to 10.
+        timeout : float, optional
+            Time in seconds without new increments after which iteration stops.
+            Defaults to None, i.e. the file is followed until the loop is left.
+
+        Yields
+        ------
+        increments : list of str
+            Names of the increments processed in this step.
+
+        Examples
+        --------
+        Add the Cauchy stress to each increment and store its volume average.
+
+        >>> import damask
+        >>> r = damask.Result('my_file.hdf5')
+        >>> r.allow_modification()
+        >>> for increments in r.follow(interval=60,timeout=3600):
+        ...     r.add_stress_Cauchy()
+        ...     r.reduce('sigma').save(f'sigma_{increments[-1]}.txt')
+
+        """
+        done = set()
+        stamp = None
+        last = time.time()
+        persistent = self._handle is not None
+        try:
+            while True:
+                stamp_,stamp = stamp,self._file_stamp()
+                if stamp == stamp_:                                                                 # no writes during last interval
+                    try:
+                        if persistent and self._handle is None: self.__enter__()
+                        self.refresh()
+                    except OSError:                                                                 # file is locked by writer
+                        pass
+                    increments = [i for i in self.increments if i not in done]
+                    if increments:
+                        visible = self.visible['increments']
+                        complete = visible == self.increments
+                        self._manage_view('set','increments',increments)
+                        try:
+                            yield increments
+                        finally:
+                            self.visible['increments'] = self.increments if complete else visible
+                        done.update(increments)
+                        last = time.time()
+                if timeout is not None and time.time()-last > timeout:
+                    return
+                self._close_handle()
+                time.sleep(0.0 if stamp_ is None else interval)
+        finally:
+            if persistent and self._handle is None: self.__enter__()
+
+
     def view(self,what,datasets):
         """
         Set view.
@@ -326,13 +720,16 @@ class Result:
 
         """
         if self._allow_modification:
-            with h5py.File(self.fname,'a') as f:
+            with self._open('a') as f:
                 for path_old in self.get_dataset_location(name_old):
                     path_new = os.path.join(os.path.dirname(path_old),name_new)
                     f[path_new] = f[path_old]
                     f[path_new].attrs['Renamed'] = f'Original name: {name_old}' if h5py3 else \
                                                    f'Original name: {name_old}'.encode()
                     del f[path_old]
+                    group = os.path.dirname(path_old)
+                    self._index[group][name_new] = self._index[group].pop(name_old)
+                    self._attributes.pop(path_old,None)
         else:
             raise PermissionError('Rename operation not permitted')
 
@@ -343,6 +740,10 @@ class Result:
 
         Must not mix nodal end cell data.
 
+        The data of each column is allocated once and read slab-wise.
+        Compound datatypes, e.g. the orientation, are converted into
+        plain numpy datatype.
+
         Only data within
         - inc*/phase/*/*
         - inc*/homogenization/*/*
@@ -365,42 +766,44 @@ class Result:
         sets = datasets if hasattr(datasets,'__iter__') and not isinstance(datasets,str) else \
               [datasets]
         tag = f'#{constituent}' if tagged else ''
-        tbl = {} if split else None
-        inGeom = {}
-        inData = {}
-        with h5py.File(self.fname,'r') as f:
-            for dataset in sets:
-                for group in self.groups_with_datasets(dataset):
-                    path = os.path.join(group,dataset)
-                    inc,prop,name,cat,item = (path.split('/') + ['']*5)[:5]
-                    key = '/'.join([prop,name+tag])
-                    if key not in inGeom:
-                        if prop == 'geometry':
-                            inGeom[key] = inData[key] = np.arange(self.N_materialpoints)
-                        elif prop == 'phase':
-                            inGeom[key] = np.where(f['mapping/phase'][:,constituent]['Name'] == str.encode(name))[0]
-                            inData[key] =          f['mapping/phase'][inGeom[key],constituent]['Position']
-                        elif prop == 'homogenization':
-                            inGeom[key] = np.where(f['mapping/homogenization']['Name'] == str.encode(name))[0]
-                            inData[key] =          f['mapping/homogenization'][inGeom[key].tolist()]['Position']
-                    shape = np.shape(f[path])
-                    data = np.full((self.N_materialpoints,) + (shape[1:] if len(shape)>1 else (1,)),
-                                   np.nan,
-                                   dtype=np.dtype(f[path]))
-                    data[inGeom[key]] = (f[path] if len(shape)>1 else np.expand_dims(f[path],1))[inData[key]]
-                    path = (os.path.join(*([prop,name]+([cat] if cat else [])+([item] if item else []))) if split else path)+tag
-                    if split:
-                        try:
-                            tbl[inc].add(path,data)
-                        except KeyError:
-                            tbl[inc] = Table(data.reshape(self.N_materialpoints,-1),{path:data.shape[1:]})
-                    else:
-                        try:
-                            tbl.add(path,data)
-                        except AttributeError:
-                            tbl = Table(data.reshape(self.N_materialpoints,-1),{path:data.shape[1:]})
-
-        return tbl
+        mapping = self._get_mapping()
+
+        columns = defaultdict(list)                                                                 # (label,shape,path,points,positions) per Table
+        for dataset in sets:
+            for group in self.groups_with_datasets(dataset):
+                path = os.path.join(group,dataset)
+                inc,prop,name,cat,item = (path.split('/') + ['']*5)[:5]
+                if prop == 'geometry':
+                    points = positions = np.arange(self.N_materialpoints)
+                elif prop == 'phase':
+                    points,positions = mapping.get((prop,name,constituent),([],[]))
+                elif prop == 'homogenization':
+                    points,positions = mapping.get((prop,name),([],[]))
+                shape,dtype = self._index[group][dataset]
+                shape = shape[1:] + ((len(dtype.names),) if dtype.names is not None else ())               # compound datatype as plain
+                label = (os.path.join(*([prop,name]+([cat] if cat else [])+([item] if item else []))) if split else path)+tag
+                columns[inc if split else None].append((label,shape if shape else (1,),path,
+                                                        np.asarray(points,dtype=int),np.asarray(positions,dtype=int)))
+
+        tbl = {}
+        with self._open() as f:
+            for t,cols in columns.items():
+                data = {}
+                for label,shape,path,points,positions in cols:
+                    dset = f[path]
+                    size = int(np.prod(shape))
+                    data[label] = np.full((self.N_materialpoints,size),np.nan,                      # single allocation per column
+                                          np.result_type(np.float32,dset.dtype if dset.dtype.names is None else dset.dtype[0]))
+                    order = np.argsort(positions,kind='stable')
+                    for s in range(0,dset.shape[0],self._slab_length):
+                        lo,hi = np.searchsorted(positions[order],[s,s+self._slab_length])
+                        if lo == hi: continue
+                        slab = dset[s:min(s+self._slab_length,dset.shape[0])]
+                        if slab.dtype.names is not None: slab = rfn.structured_to_unstructured(slab)
+                        data[label][points[order[lo:hi]]] = slab[positions[order[lo:hi]]-s].reshape(hi-lo,size)
+                tbl[t] = Table(data,{label:shape for label,shape,_,_,_ in cols})
+
+        return tbl if split else tbl.get(None)
 
 
     def groups_with_datasets(self,datasets):
@@ -437,77 +840,76 @@ class Result:
         sets = datasets if isinstance(datasets,bool) or (hasattr(datasets,'__iter__') and not isinstance(datasets,str)) else \
               [datasets]
 
+        index = self._get_index()
         groups = []
 
-        with h5py.File(self.fname,'r') as f:
-            for i in self.iterate('increments'):
-                for o,p in zip(['phases','homogenizations'],['out_type_ph','out_type_ho']):
-                    for oo in self.iterate(o):
-                        for pp in self.iterate(p):
-                            group = '/'.join([i,o[:-1],oo,pp])                                      # o[:-1]: plural/singular issue
-                            if sets is True:
-                                groups.append(group)
-                            else:
-                                if group in f.keys():
-                                    match = [e for e_ in [glob.fnmatch.filter(f[group].keys(),s) for s in sets] for e in e_]
-                                    if len(set(match)) == len(sets): groups.append(group)
+        for i in self.visible['increments']:
+            for o,p in zip(['phases','homogenizations'],['out_type_ph','out_type_ho']):
+                for oo in self.visible[o]:
+                    for pp in self.visible[p]:
+                        group = '/'.join([i,o[:-1],oo,pp])                                          # o[:-1]: plural/singular issue
+                        if sets is True:
+                            groups.append(group)
+                        elif group in index:
+                            match = [e for e_ in [glob.fnmatch.filter(index[group],s) for s in sets] for e in e_]
+                            if len(set(match)) == len(sets): groups.append(group)
         return groups
 
 
     def list_data(self):
         """Return information on all active datasets in the file."""
+        index = self._get_index()
         message = ''
-        with h5py.File(self.fname,'r') as f:
-            for i in self.iterate('increments'):
-                message += f'\n{i} ({self.times[self.increments.index(i)]}s)\n'
-                for o,p in zip(['phases','homogenizations'],['out_type_ph','out_type_ho']):
-                    message += f'  {o[:-1]}\n'
-                    for oo in self.iterate(o):
-                        message += f'    {oo}\n'
-                        for pp in self.iterate(p):
-                            message += f'      {pp}\n'
-                            group = '/'.join([i,o[:-1],oo,pp])                                      # o[:-1]: plural/singular issue
-                            for d in f[group].keys():
-                                try:
-                                    dataset = f['/'.join([group,d])]
-                                    if 'Unit' in dataset.attrs:
-                                        unit = f" / {dataset.attrs['Unit']}" if h5py3 else \
-                                               f" / {dataset.attrs['Unit'].decode()}"
-                                    else:
-                                        unit = ''
-                                    description = dataset.attrs['Description'] if h5py3 else \
-                                                  dataset.attrs['Description'].decode()
-                                    message += f'        {d}{unit}: {description}\n'
-                                except KeyError:
-                                    pass
+        for i in self.visible['increments']:
+            message += f'\n{i} ({self.times[self.increments.index(i)]}s)\n'
+            for o,p in zip(['phases','homogenizations'],['out_type_ph','out_type_ho']):
+                message += f'  {o[:-1]}\n'
+                for oo in self.visible[o]:
+                    message += f'    {oo}\n'
+                    for pp in self.visible[p]:
+                        message += f'      {pp}\n'
+                        group = '/'.join([i,o[:-1],oo,pp])                                          # o[:-1]: plural/singular issue
+                        for d in index[group]:
+                            try:
+                                attrs = self._get_attributes('/'.join([group,d]))
+                                unit = f" / {attrs['Unit']}" if 'Unit' in attrs else ''
+                                message += f"        {d}{unit}: {attrs['Description']}\n"
+                            except KeyError:
+                                pass
         return message
 
 
     def get_dataset_location(self,label):
         """Return the location of all active datasets with given label."""
+        index = self._get_index()
         path = []
-        with h5py.File(self.fname,'r') as f:
-            for i in self.iterate('increments'):
-                k = '/'.join([i,'geometry',label])
-                try:
-                    f[k]
-                    path.append(k)
-                except KeyError:
-                    pass
-                for o,p in zip(['phases','homogenizations'],['out_type_ph','out_type_ho']):
-                    for oo in self.iterate(o):
-                        for pp in self.iterate(p):
-                            k = '/'.join([i,o[:-1],oo,pp,label])
-                            try:
-                                f[k]
-                                path.append(k)
-                            except KeyError:
-                                pass
+        for i in self.visible['increments']:
+            if label in index.get(f'{i}/geometry',{}):
+                path.append('/'.join([i,'geometry',label]))
+            for o,p in zip(['phases','homogenizations'],['out_type_ph','out_type_ho']):
+                for oo in self.visible[o]:
+                    for pp in self.visible[p]:
+                        group = '/'.join([i,o[:-1],oo,pp])                                          # o[:-1]: plural/singular issue
+                        if label in index.get(group,{}):
+                            path.append('/'.join([group,label]))
         return path
 
 
     def enable_user_function(self,func):
+        """
+        Enable a function for use in add_calculation.
+
+        Formulas using the function are evaluated for all
+        material points of a group at once.
+
+        Parameters
+        ----------
+        func : function
+            Function to be enabled.
+
+        """
         globals()[func.__name__]=func
+        self._close_pool()                                                                          # workers need to know the function
         print(f'Function {func.__name__} enabled in add_calculation.')
 
 
@@ -529,28 +931,20 @@ class Result:
             Defaults to False.
 
         """
-        with h5py.File(self.fname,'r') as f:
+        mapping = self._get_mapping()
+        with self._open() as f:
             shape = (self.N_materialpoints,) + np.shape(f[path[0]])[1:]
             if len(shape) == 1: shape = shape +(1,)
             dataset = np.full(shape,np.nan,dtype=np.dtype(f[path[0]]))
             for pa in path:
-                label = pa.split('/')[2]
+                ty,label = pa.split('/')[1:3]
 
-                if pa.split('/')[1] == 'geometry':
+                if ty == 'geometry':
                     dataset = np.array(f[pa])
                     continue
 
-                p = np.where(f['mapping/phase'][:,c]['Name'] == str.encode(label))[0]
+                p,u = mapping.get((ty,label,c) if ty == 'phase' else (ty,label),([],[]))
                 if len(p)>0:
-                    u = (f['mapping/phase']['Position'][p,c])
-                    a = np.array(f[pa])
-                    if len(a.shape) == 1:
-                        a=a.reshape([a.shape[0],1])
-                    dataset[p,:] = a[u,:]
-
-                p = np.where(f['mapping/homogenization']['Name'] == str.encode(label))[0]
-                if len(p)>0:
-                    u = (f['mapping/homogenization']['Position'][p.tolist()])
                     a = np.array(f[pa])
                     if len(a.shape) == 1:
                         a=a.reshape([a.shape[0],1])
@@ -561,13 +955,233 @@ class Result:
         else:
             return dataset
 
+
+    def lazy_dataset(self,path,c=0,plain=False):
+        """
+        Dataset for all points/cells that is read on access.
+
+        Only the data of the selected material points is read from file
+        when indexing the returned object with NumPy syntax.
+
+        Parameters
+        ----------
+        path : list of strings
+            The name of the datasets to consider.
+        c : int, optional
+            The constituent to consider. Defaults to 0.
+        plain: boolean, optional
+            Convert into plain numpy datatype.
+            Only relevant for compound datatype, e.g. the orientation.
+            Defaults to False.
+
+        Returns
+        -------
+        dataset : damask._result.LazyDataset
+            Lazy dataset of shape (N_materialpoints,...) supporting
+            indexing by material point, by cell (via its 'grid' attribute)
+            and listing the covered material points (via its 'points' attribute).
+
+        Examples
+        --------
+        Read deformation gradient of first ten material points and of the
+        first layer of cells.
+
+        >>> import damask
+        >>> r = damask.Result('my_file.hdf5')
+        >>> F = r.lazy_dataset(r.get_dataset_location('F'))
+        >>> F[:10].shape
+        (10, 3, 3)
+        >>> F.grid[:,:,0].shape
+        (16, 16, 3, 3)
+
+        """
+        return LazyDataset(self,path,c,plain)
+
+
+    @staticmethod
+    def _time_series_job(result,paths,points,c,plain):
+        """Read selected material points for each list of paths (increment)."""
+        return np.stack([result.lazy_dataset(pa,c,plain)[points] for pa in paths])
+
+    def time_series(self,label,points,c=0,plain=False,parallel=False):
+        """
+        Dataset for selected points/cells in all visible increments.
+
+        Parameters
+        ----------
+        label : str
+            Label of the dataset.
+        points : int or iterable of int
+            Indices of the material points.
+        c : int, optional
+            The constituent to consider. Defaults to 0.
+        plain: boolean, optional
+            Convert into plain numpy datatype.
+            Only relevant for compound datatype, e.g. the orientation.
+            Defaults to False.
+        parallel : bool, optional
+            Read increments in parallel using the worker pool.
+            Defaults to False.
+
+        Returns
+        -------
+        data : numpy.ndarray of shape (N_increments,N_points,...)
+            Values of the selected material points, increments
+            without the dataset are filled with NaN.
+
+        Examples
+        --------
+        Stress-strain curve of material point 42.
+
+        >>> import damask
+        >>> r = damask.Result('my_file.hdf5')
+        >>> P = r.time_series('P',42)[:,0]
+        >>> F = r.time_series('F',42)[:,0]
+
+        """
+        points = np.atleast_1d(points)
+        location = self.get_dataset_location(label)
+        if not location:
+            raise ValueError(f'Dataset "{label}" not found')
+        paths = [[l for l in location if l.split('/')[0] == inc] for inc in self.visible['increments']]
+
+        available = [pa for pa in paths if pa]
+        data = np.concatenate(self._map_increments(self._time_series_job,available,(points,c,plain),parallel))
+
+        if len(available) == len(paths):
+            return data
+        else:
+            data_ = np.full((len(paths),)+data.shape[1:],np.nan,data.dtype)
+            data_[[i for i,pa in enumerate(paths) if pa]] = data
+            return data_
+
+    @staticmethod
+    def _reduce_job(result,paths,operations,q,bins,bins_range,per_phase):
+        """Reduce the datasets of each list of paths (increment) slab-wise."""
+        def reduce(f,location):
+            acc = {'sum':0.,'N':0,'min':None,'max':None,'histogram':0,'data':[]}
+            for pa in location:
+                dset = f[pa]
+                for s in range(0,dset.shape[0],result._slab_length):
+                    d = dset[s:s+result._slab_length]
+                    acc['sum'] = acc['sum'] + np.sum(d,axis=0,dtype=np.float64)
+                    acc['N']  += d.shape[0]
+                    acc['min'] = np.min(d,axis=0) if acc['min'] is None else np.minimum(acc['min'],np.min(d,axis=0))
+                    acc['max'] = np.max(d,axis=0) if acc['max'] is None else np.maximum(acc['max'],np.max(d,axis=0))
+                    if 'histogram' in operations:
+                        acc['histogram'] = acc['histogram'] + np.histogram(d,bins,bins_range)[0]
+                    if 'percentile' in operations:
+                        acc['data'].append(d)
+            reduced = {'N':acc['N']}
+            for o in operations:
+                reduced[o] = np.percentile(np.concatenate(acc['data']),q,axis=0) if o == 'percentile' else \
+                             acc['sum']/acc['N'] if o == 'mean' else \
+                             acc[o]
+            return reduced
+
+        out = []
+        with result._open() as f:
+            for location in paths:
+                groups = defaultdict(list)
+                for pa in location:
+                    groups[(pa.split('/')[1],pa.split('/')[2] if per_phase else None)].append(pa)
+                out.append({name:reduce(f,group) for name,group in groups.items()})
+        return out
+
+    def reduce(self,label,operations='mean',q=50,bins=10,bins_range=None,per_phase=False,parallel=False):
+        """
+        Reduce a dataset over all material points of each visible increment.
+
+        The datasets are read and reduced in slabs of material points,
+        except for the calculation of percentiles, which requires
+        the complete data of an increment.
+
+        Parameters
+        ----------
+        label : str
+            Label of the dataset.
+        operations : str or iterable of str, optional
+            Reductions to perform. Valid entries are 'mean', 'min', 'max',
+            'percentile', and 'histogram'. Defaults to 'mean'.
+        q : float or sequence of float, optional
+            Percentile(s) in the range [0,100]. Defaults to 50.
+        bins : int, optional
+            Number of bins of the histogram. Defaults to 10.
+        bins_range : (float,float), optional
+            Lower and upper bound of the histogram bins.
+            Defaults to the minimum and maximum over all visible increments.
+        per_phase : bool, optional
+            Reduce separately per phase/homogenization and report the
+            fraction of the material points. Defaults to False.
+            Phase and homogenization datasets are never reduced together.
+        parallel : bool, optional
+            Reduce increments in parallel using the worker pool.
+            Defaults to False.
+
+        Returns
+        -------
+        reduced : damask.Table
+            Increment, time, and the reduced values, one row per increment.
+            Labels are formatted as 'operation(label)', prefixed by
+            'name/' if reducing per phase/homogenization and by
+            'phase/' or 'homogenization/' if the dataset exists for both.
+            Values of increments without the dataset are NaN.
+
+        Examples
+        --------
+        Volume-averaged stress-strain curve.
+
+        >>> import damask
+        >>> r = damask.Result('my_file.hdf5')
+        >>> r.reduce('P').get('mean(P)')[:,1,1]
+
+        """
+        operations_ = [operations] if isinstance(operations,str) else list(operations)
+        for o in operations_:
+            if o not in ['mean','min','max','percentile','histogram']:
+                raise ValueError(f'invalid reduction "{o}"')
+        location = self.get_dataset_location(label)
+        if not location:
+            raise ValueError(f'Dataset "{label}" not found')
+        increments = [inc for inc in self.visible['increments'] if any(l.split('/')[0] == inc for l in location)]
+        paths = [[l for l in location if l.split('/')[0] == inc] for inc in increments]
+
+        if 'histogram' in operations_ and bins_range is None:
+            extrema = sum(self._map_increments(self._reduce_job,paths,(['min','max'],q,bins,None,False),parallel),[])
+            bins_range = (float(np.min([e_['min'] for e in extrema for e_ in e.values()])),
+                     float(np.max([e_['max'] for e in extrema for e_ in e.values()])))
+
+        reduced = sum(self._map_increments(self._reduce_job,paths,
+                                           (operations_,q,bins,bins_range,per_phase),parallel),[])
+
+        columns = {'inc':   (np.array([int(inc[3:]) for inc in increments]),()),
+                   'time':  (np.array([self.times[self.increments.index(inc)] for inc in increments]),())}
+        keys = list(dict.fromkeys(k for r in reduced for k in r))                                  # groups of all increments
+        kinds = set(kind for kind,_ in keys)
+        for kind,name in keys:
+            prefix = (f'{kind}/' if len(kinds) > 1 else '') + ('' if name is None else f'{name}/')
+            if per_phase:
+                columns[f'{prefix}fraction'] = (np.array([r[(kind,name)]['N']/sum(r_['N'] for k,r_ in r.items() if k[0] == kind)
+                                                          if (kind,name) in r else 0. for r in reduced]),())
+            for o in operations_:
+                shape = np.shape(next(r[(kind,name)][o] for r in reduced if (kind,name) in r))
+                data = np.array([r[(kind,name)][o] if (kind,name) in r else np.full(shape,np.nan)
+                                 for r in reduced])
+                columns[f'{prefix}{o}({label})'] = (data,data.shape[1:])
+
+        comments = [util.execution_stamp('Result','reduce'),f'source: {self.fname}']
+        if 'histogram' in operations_:
+            comments.append(f'histogram({label}) bin edges: {np.histogram_bin_edges([],bins,bins_range).tolist()}')
+        return Table(np.hstack([d.reshape(len(increments),-1) for d,_ in columns.values()]),
+                     {k:v for k,(_,v) in columns.items()},comments)
+
     @property
     def coordinates0_point(self):
         """Return initial coordinates of the cell centers."""
         if self.structured:
             return grid_filters.coordinates0_point(self.cells,self.size,self.origin).reshape(-1,3,order='F')
         else:
-            with h5py.File(self.fname,'r') as f:
+            with self._open() as f:
                 return f['geometry/x_c'][()]
 
     @property
@@ -576,7 +1190,7 @@ class Result:
         if self.structured:
             return grid_filters.coordinates0_node(self.cells,self.size,self.origin).reshape(-1,3,order='F')
         else:
-            with h5py.File(self.fname,'r') as f:
+            with self._open() as f:
                 return f['geometry/x_n'][()]
 
 
@@ -607,15 +1221,13 @@ class Result:
     @staticmethod
     def _add_calculation(**kwargs):
         formula = kwargs['formula']
-        for d in re.findall(r'#(.*?)#',formula):
-            formula = formula.replace(f'#{d}#',f"kwargs['{d}']['data']")
 
         return {
-                'data':  eval(formula),
+                'data':  formula({l:kwargs[l]['data'] for l in formula.labels}),
                 'label': kwargs['label'],
                 'meta':  {
                           'Unit':        kwargs['unit'],
-                          'Description': f"{kwargs['description']} (formula: {kwargs['formula']})",
+                          'Description': f"{kwargs['description']} (formula: {formula.formula})",
                           'Creator':     'add_calculation'
                           }
                  }
@@ -623,6 +1235,14 @@ class Result:
         """
         Add result of a general formula.
 
+        The formula is parsed once. Formulas consisting of arithmetic operations,
+        comparisons, and elementwise NumPy functions (e.g. 'np.sqrt') are checked
+        against the shapes and types of the datasets and evaluated without
+        intermediate copies, using numexpr if installed. Such formulas are
+        evaluated in slabs of material points. Any other formula, e.g. using
+        reductions such as 'np.mean' or user functions, is evaluated for all
+        material points of a group at once.
+
         Parameters
         ----------
         label : str
@@ -635,9 +1255,12 @@ class Result:
             Human-readable description of the result.
 
         """
-        dataset_mapping  = {d:d for d in set(re.findall(r'#(.*?)#',formula))}                       # datasets used in the formula
-        args             = {'formula':formula,'label':label,'unit':unit,'description':description}
-        self._add_generic_pointwise(self._add_calculation,dataset_mapping,args)
+        formula_ = _Formula(formula)
+        for group in self.groups_with_datasets(formula_.labels):
+            formula_.check({l:self._index[group][l] for l in formula_.labels})
+        dataset_mapping  = {d:d for d in formula_.labels}                                           # datasets used in the formula
+        args             = {'formula':formula_,'label':label,'unit':unit,'description':description}
+        self._add_generic_pointwise(self._add_calculation,dataset_mapping,args,formula_.elementwise)
 
 
     @staticmethod
@@ -1098,26 +1721,184 @@ class Result:
         self._add_generic_pointwise(self._add_stretch_tensor,{'F':F},{'t':t})
 
 
-    def _job(self,group,func,datasets,args,lock):
-        """Execute job for _add_generic_pointwise."""
+    @staticmethod
+    def _add_curl(f,size):
+        return {
+                'data':  grid_filters.curl(size,f['data']),
+                'label': f"curl({f['label']})",
+                'meta':  {
+                          'Unit':        f"{f['meta']['Unit']}/m",
+                          'Description': f"Curl of {f['label']} ({f['meta']['Description']})",
+                          'Creator':     'add_curl'
+                          }
+                 }
+    def add_curl(self,f):
+        """
+        Add curl of a field.
+
+        Requires a structured grid. Increments are processed in parallel.
+
+        Parameters
+        ----------
+        f : str
+            Label of vector or tensor field.
+
+        """
+        self._add_generic_grid(self._add_curl,{'f':f},{'size':self.size})
+
+
+    @staticmethod
+    def _add_divergence(f,size):
+        return {
+                'data':  grid_filters.divergence(size,f['data']),
+                'label': f"divergence({f['label']})",
+                'meta':  {
+                          'Unit':        f"{f['meta']['Unit']}/m",
+                          'Description': f"Divergence of {f['label']} ({f['meta']['Description']})",
+                          'Creator':     'add_divergence'
+                          }
+                 }
+    def add_divergence(self,f):
+        """
+        Add divergence of a field.
+
+        Requires a structured grid. Increments are processed in parallel.
+
+        Parameters
+        ----------
+        f : str
+            Label of vector or tensor field.
+
+        """
+        self._add_generic_grid(self._add_divergence,{'f':f},{'size':self.size})
+
+
+    @staticmethod
+    def _add_gradient(f,size):
+        return {
+                'data':  grid_filters.gradient(size,f['data'].reshape(f['data'].shape[:3]+(-1,))),
+                'label': f"gradient({f['label']})",
+                'meta':  {
+                          'Unit':        f"{f['meta']['Unit']}/m",
+                          'Description': f"Gradient of {f['label']} ({f['meta']['Description']})",
+                          'Creator':     'add_gradient'
+                          }
+                 }
+    def add_gradient(self,f):
+        """
+        Add gradient of a field.
+
+        Requires a structured grid. Increments are processed in parallel.
+
+        Parameters
+        ----------
+        f : str
+            Label of scalar or vector field.
+
+        """
+        self._add_generic_grid(self._add_gradient,{'f':f},{'size':self.size})
+
+
+    @staticmethod
+    def _add_displacement(F,size,mode):
+        return {
+                'data':  grid_filters.displacement_point(size,F['data']) if mode == 'point' else
+                         grid_filters.displacement_node(size,F['data']),
+                'label': f"u_{mode[0]}({F['label']})",
+                'meta':  {
+                          'Unit':        'm',
+                          'Description': f"Displacement of the {'cell centers' if mode == 'point' else 'nodes'} "
+                                         f"calculated from {F['label']} ({F['meta']['Description']})",
+                          'Creator':     'add_displacement'
+                          }
+                 }
+    def add_displacement(self,F='F',mode='point'):
+        """
+        Add displacement calculated from deformation gradient.
+
+        Requires a structured grid. Increments are processed in parallel.
+        Nodal displacements are stored in the geometry group.
+
+        Parameters
+        ----------
+        F : str, optional
+            Label of deformation gradient dataset. Defaults to ‘F’.
+        mode : {'point', 'node'}, optional
+            Calculate displacement of cell centers ('point') or nodes ('node').
+            Defaults to 'point'.
+
+        """
+        if mode not in ['point','node']:
+            raise ValueError(f'invalid mode "{mode}"')
+        self._add_generic_grid(self._add_displacement,{'F':F},{'size':self.size,'mode':mode})
+
+
+    @contextmanager
+    def batch(self):
+        """
+        Combine the add_* operations called within the context.
+
+        The operations are executed when leaving the context.
+        Per group, all inputs are read once, all outputs are calculated
+        in memory and written together. Outputs of one operation can
+        serve as input for other operations.
+
+        Examples
+        --------
+        Add Cauchy stress and its Mises equivalent in one pass.
+
+        >>> import damask
+        >>> r = damask.Result('my_file.hdf5')
+        >>> with r.batch():
+        ...     r.add_stress_Cauchy()
+        ...     r.add_equivalent_Mises('sigma')
+
+        """
+        self._batch = []
         try:
-            datasets_in = {}
-            lock.acquire()
-            with h5py.File(self.fname,'r') as f:
-                for arg,label in datasets.items():
-                    loc  = f[group+'/'+label]
-                    datasets_in[arg]={'data' :loc[()],
-                                      'label':label,
-                                      'meta': {k:(v if h5py3 else v.decode()) for k,v in loc.attrs.items()}}
-            lock.release()
-            r = func(**datasets_in,**args)
-            return [group,r]
-        except Exception as err:
-            print(f'Error during calculation: {err}.')
-            return None
+            yield self
+            requests = self._batch
+        finally:
+            self._batch = None
+        if requests: self._add_pointwise(requests)
 
 
-    def _add_generic_pointwise(self,func,datasets,args={}):
+    @staticmethod
+    def _job(requests,datasets,out):
+        """
+        Execute job (slab of material points of a group) for _add_pointwise.
+
+        Input and output data are exchanged as memory-mapped .npy files.
+        Operations are executed in the given order, repeatedly until
+        no more operations can be executed due to missing inputs.
+
+        """
+        results   = [None]*len(requests)
+        try:
+            available = {label:{**d,'data':np.asarray(np.load(d['data'],mmap_mode='c'))} for label,d in datasets.items()}
+        except (OSError,ValueError) as err:
+            print(f'Error reading input: {err}.')
+            return results
+        todo      = list(range(len(requests)))
+        while todo:
+            done = []
+            for i in todo:
+                func,datasets_,args = requests[i][:3]
+                if not set(datasets_.values()).issubset(available): continue
+                done.append(i)
+                try:
+                    r = func(**{arg:available[label] for arg,label in datasets_.items()},**args)
+                    available[r['label']] = r
+                    np.save(f'{out}_{i}.npy',r['data'])
+                    results[i] = {**r,'data':f'{out}_{i}.npy'}
+                except Exception as err:
+                    print(f'Error during calculation: {err}.')
+            if not done: break
+            todo = [i for i in todo if i not in done]
+        return results
+
+
+    def _add_generic_pointwise(self,func,datasets,args={},pointwise=True):
         """
         General function to add pointwise data.
 
@@ -1131,58 +1912,296 @@ class Result:
             arg (argument to which the data is parsed in func).
         args : dictionary, optional
             Arguments parsed to func.
+        pointwise : bool, optional
+            Result at a material point depends only on the data at this point.
+            If False, the data of a group is processed at once. Defaults to True.
+
+        """
+        if self._batch is not None:
+            self._batch.append((func,datasets,args,pointwise))
+        else:
+            self._add_pointwise([(func,datasets,args,pointwise)])
+
+
+    def _create_dataset(self,f,group,label,shape,dtype,meta):
+        """
+        Create dataset according to storage policy and set its attributes.
+
+        An existing dataset is reused if modification is allowed.
+
+        Parameters
+        ----------
+        f : h5py.File
+            DADF5 file opened for writing.
+        group : str
+            Group containing the dataset.
+        label : str
+            Name of the dataset.
+        shape : tuple
+            Shape of the dataset.
+        dtype : numpy.dtype
+            Data type of the dataset.
+        meta : dict
+            Attributes of the dataset, 'Creator' is extended by the version.
 
         """
         chunk_size = 1024**2//8
-        pool = mp.Pool(int(os.environ.get('OMP_NUM_THREADS',1)))
-        lock = mp.Manager().Lock()
 
-        groups = self.groups_with_datasets(datasets.values())
+        if self._allow_modification and group+'/'+label in f:
+            dataset = f[group+'/'+label]
+            dataset.attrs['Overwritten'] = 'Yes' if h5py3 else \
+                                           'Yes'.encode()
+        elif np.prod(shape) >= chunk_size*2 and any(self._storage['filters'].values()):
+            if self._storage['layout'] == 'point':                                                  # power of 2 to align with slabs
+                chunks = (2**int(np.log2(max(1,chunk_size//np.prod(shape[1:])))),)+shape[1:]
+            else:
+                chunks = (min(2**int(np.log2(chunk_size)),shape[0]),)+(1,)*(len(shape)-1)
+            dataset = f[group].create_dataset(label,shape=shape,dtype=dtype,
+                                              maxshape=shape,chunks=chunks,
+                                              **self._storage['filters'])
+        else:
+            dataset = f[group].create_dataset(label,shape=shape,dtype=dtype)
+
+        now = datetime.datetime.now().astimezone()
+        dataset.attrs['Created'] = now.strftime('%Y-%m-%d %H:%M:%S%z') if h5py3 else \
+                                   now.strftime('%Y-%m-%d %H:%M:%S%z').encode()
+
+        for l,v in meta.items():
+            dataset.attrs[l]=v if h5py3 else v.encode()
+        creator = dataset.attrs['Creator'] if h5py3 else \
+                  dataset.attrs['Creator'].decode()
+        dataset.attrs['Creator'] = f"damask.Result.{creator} v{damask.version}" if h5py3 else \
+                                   f"damask.Result.{creator} v{damask.version}".encode()
+
+        self._index[group][label] = (dataset.shape,dataset.dtype)
+        self._attributes.pop(group+'/'+label,None)
+
+
+    def _add_pointwise(self,requests):
+        """
+        Add pointwise data for one or more operations.
+
+        Large datasets are processed in slabs of material points
+        to limit memory consumption. Groups used in operations that
+        are not pointwise are processed at once.
+
+        Inputs are read and results are written by separate threads
+        through a single file handle, i.e. file access is serialized
+        by h5py but overlaps with the calculations of the workers.
+        Workers cannot read concurrently because SWMR mode does not
+        allow to create datasets.
+
+        Parameters
+        ----------
+        requests : list of tuple
+            Callback function, details of the datasets, arguments, and
+            whether it is pointwise for each operation (see _add_generic_pointwise).
+
+        """
+        groups = []
+        for _,datasets,_,_ in requests:
+            groups += [g for g in self.groups_with_datasets(datasets.values()) if g not in groups]
         if len(groups) == 0:
             print('No matching dataset found, no data was added.')
             return
 
-        default_arg = partial(self._job,func=func,datasets=datasets,args=args,lock=lock)
-
-        for result in util.show_progress(pool.imap_unordered(default_arg,groups),len(groups)):
-            if not result:
-                continue
-            lock.acquire()
-            with h5py.File(self.fname, 'a') as f:
+        jobs = []
+        for group in groups:
+            labels = list(dict.fromkeys(l for _,datasets,_,_ in requests for l in datasets.values()
+                                        if l in self._index[group]))
+            if labels:
+                N = self._index[group][labels[0]][0][0]
+                slab_length = self._slab_length if all(pointwise for _,datasets,_,pointwise in requests
+                                                       if set(datasets.values()) & set(labels)) else max(N,1)
+                jobs += [(group,slice(s,min(s+slab_length,N)),labels,N) for s in range(0,N,slab_length)]
+            else:
+                jobs.append((group,slice(None),labels,None))
+
+        pool = self._get_pool()
+        tmp = tempfile.TemporaryDirectory(dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+        N_pending = 2*int(os.environ.get('OMP_NUM_THREADS',1))
+
+        def results(f):
+            """Read inputs and dispatch jobs to workers with a bounded number of pending jobs."""
+            pending = deque()
+            for i,(group,slab,labels,N) in enumerate(jobs):
+                datasets_in = {}
+                for j,label in enumerate(labels):
+                    loc = f[group+'/'+label]
+                    fname = os.path.join(tmp.name,f'{i}_in{j}.npy')
+                    data = np.lib.format.open_memmap(fname,mode='w+',dtype=loc.dtype,
+                                                     shape=(slab.stop-slab.start,)+loc.shape[1:])
+                    loc.read_direct(data,slab)
+                    data.flush()
+                    datasets_in[label] = {'data': fname,
+                                          'label':label,
+                                          'meta': self._get_attributes(group+'/'+label)}
+                pending.append((i,pool.apply_async(self._job,(requests,datasets_in,os.path.join(tmp.name,f'{i}')))))
+                while len(pending) > N_pending or (i == len(jobs)-1 and pending):
+                    i_,r = pending.popleft()
+                    yield i_,r.get()
+
+        def write(f,queue,errors):
+            """Write results from queue until receiving None."""
+            written = {}                                                                            # label and whether newly created, per group and operation
+            failed  = set()
+            for i,r in iter(queue.get,None):
+                if errors: continue                                                                 # drain queue
                 try:
-                    if self._allow_modification and result[0]+'/'+result[1]['label'] in f:
-                        dataset = f[result[0]+'/'+result[1]['label']]
-                        dataset[...] = result[1]['data']
-                        dataset.attrs['Overwritten'] = 'Yes' if h5py3 else \
-                                                       'Yes'.encode()
+                    group,slab,_,N = jobs[i]
+                    for k,r_ in enumerate(r):
+                        if (group,k) in failed:
+                            continue
+                        try:
+                            if r_ is None:
+                                raise RuntimeError(f'no result for {group}')
+                            data = np.load(r_['data'],mmap_mode='r')
+                            if (group,k) not in written:
+                                shape = (data.shape[0] if N is None else N,)+data.shape[1:]
+                                written[(group,k)] = (r_['label'],r_['label'] not in self._index[group])
+                                self._create_dataset(f,group,r_['label'],shape,data.dtype,r_['meta'])
+
+                            f[group+'/'+r_['label']][slab] = data
+
+                        except (OSError,RuntimeError) as err:
+                            if r_ is not None: print(f'Could not add dataset: {err}.')
+                            failed.add((group,k))
+                            if (group,k) in written and written[(group,k)][1]:                      # remove incomplete dataset
+                                del f[group+'/'+written[(group,k)][0]]
+                                del self._index[group][written[(group,k)][0]]
+                except Exception as err:
+                    errors.append(err)
+                finally:
+                    for fname in glob.glob(os.path.join(tmp.name,f'{i}_*.npy')):
+                        os.remove(fname)
+
+        with self._open('a') as f:
+            queue  = Queue(maxsize=N_pending)
+            errors = []
+            writer = threading.Thread(target=write,args=(f,queue,errors))
+
+            def put(item):
+                """Put item into queue, fails if the writer has terminated."""
+                while writer.is_alive():
+                    try:
+                        queue.put(item,timeout=1.0)
+                        return True
+                    except Full:
+                        pass
+                return False
+
+            writer.start()
+            try:
+                for i,r in util.show_progress(results(f),len(jobs)):
+                    if not put((i,r)) and not errors:
+                        errors.append(RuntimeError('writer terminated unexpectedly'))
+                    if errors: break
+            finally:
+                put(None)
+                writer.join()
+                tmp.cleanup()
+            if errors: raise errors[0]
+
+
+    def _add_generic_grid(self,func,datasets,args={}):
+        """
+        General function to add data calculated on a structured grid.
+
+        Per visible increment, the datasets are assembled on the grid,
+        processed in the worker pool, and written to the groups of the
+        first dataset. Results on the nodes are written to the geometry group.
+        Phase datasets are only supported for a single constituent.
+
+        Parameters
+        ----------
+        func : function
+            Callback function that calculates a new dataset from one or
+            more datasets on the grid.
+        datasets : dictionary
+            Details of the datasets to be used: label (in HDF5 file) and
+            arg (argument to which the data is parsed in func).
+        args : dictionary, optional
+            Arguments parsed to func.
+
+        """
+        if not self.structured:
+            raise TypeError('grid operations require structured grid')
+        if self.N_constituents > 1 and any(p.split('/')[1] == 'phase'
+                                           for l in datasets.values() for p in self.get_dataset_location(l)):
+            raise ValueError('grid operations on phase datasets require a single constituent')
+
+        cells = tuple(self.cells)
+        N = np.prod(cells)
+
+        def read(inc,label):
+            """Paths and data on the grid of a dataset in an increment."""
+            paths = [p for p in self.get_dataset_location(label) if p.split('/')[0] == inc]
+            if not paths: return [],None
+            if paths[0].split('/')[1] == 'geometry':
+                with self._open() as f:
+                    data = f[paths[0]][()]
+            else:
+                dataset = self.lazy_dataset(paths)
+                if len(dataset.points) != N: return [],None
+                data = dataset[:]
+            return paths,data.reshape(N,-1).reshape(cells+(-1,),order='F').reshape(cells+data.shape[1:])
+
+        def write(f,inc,paths,r):
+            """Write result to groups of the first dataset or to geometry group."""
+            data = np.load(r['data'],mmap_mode='r')
+            node = data.shape[:3] != cells
+            flat = data.reshape(data.shape[:3]+(-1,)).reshape(np.prod(data.shape[:3]),-1,order='F') \
+                       .reshape((-1,)+data.shape[3:])
+            groups = [f'{inc}/geometry'] if node else [os.path.dirname(p) for p in paths]
+            for group in groups:
+                if group.split('/')[1] == 'geometry':
+                    f.require_group(group)
+                    self._index.setdefault(group,{})
+                    out = flat
+                else:
+                    _,ty,name,_ = group.split('/')
+                    points,positions = mapping[(ty,name,0) if ty == 'phase' else (ty,name)]
+                    out = np.full((self._index[group][os.path.basename(paths[0])][0][0],)+flat.shape[1:],np.nan)
+                    out[positions] = flat[points]
+                if not self._allow_modification and r['label'] in self._index[group]:
+                    print(f'Could not add dataset: {group}/{r["label"]} exists.')
+                    continue
+                self._create_dataset(f,group,r['label'],out.shape,out.dtype,r['meta'])
+                f[group+'/'+r['label']][...] = out
+            self._mapping_stamp = self._file_stamp()                                                # own writes do not alter the mapping
+
+        mapping = self._get_mapping()
+        pool = self._get_pool()
+        tmp = tempfile.TemporaryDirectory(dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+        N_pending = int(os.environ.get('OMP_NUM_THREADS',1))
+        increments = self.visible['increments']
+
+        with self._open('a') as f:
+            try:
+                pending = deque()
+                for i,inc in enumerate(util.show_progress(increments)):
+                    datasets_in = {}
+                    for j,label in enumerate(datasets.values()):
+                        paths,data = read(inc,label)
+                        if data is None:
+                            print(f'No complete dataset "{label}" in {inc}, no data was added.')
+                            break
+                        np.save(os.path.join(tmp.name,f'{i}_in{j}.npy'),data)
+                        datasets_in[label] = {'data': os.path.join(tmp.name,f'{i}_in{j}.npy'),
+                                              'label':label,
+                                              'meta': self._get_attributes(paths[0])}
+                        if j == 0: paths_out = paths
                     else:
-                        if result[1]['data'].size >= chunk_size*2:
-                            shape  = result[1]['data'].shape
-                            chunks = (chunk_size//np.prod(shape[1:]),)+shape[1:]
-                            dataset = f[result[0]].create_dataset(result[1]['label'],data=result[1]['data'],
-                                                                  maxshape=shape, chunks=chunks,
-                                                                  compression='gzip', compression_opts=6,
-                                                                  shuffle=True,fletcher32=True)
-                        else:
-                            dataset = f[result[0]].create_dataset(result[1]['label'],data=result[1]['data'])
-
-                    now = datetime.datetime.now().astimezone()
-                    dataset.attrs['Created'] = now.strftime('%Y-%m-%d %H:%M:%S%z') if h5py3 else \
-                                               now.strftime('%Y-%m-%d %H:%M:%S%z').encode()
-
-                    for l,v in result[1]['meta'].items():
-                        dataset.attrs[l]=v if h5py3 else v.encode()
-                    creator = dataset.attrs['Creator'] if h5py3 else \
-                              dataset.attrs['Creator'].decode()
-                    dataset.attrs['Creator'] = f"damask.Result.{creator} v{damask.version}" if h5py3 else \
-                                               f"damask.Result.{creator} v{damask.version}".encode()
-
-                except (OSError,RuntimeError) as err:
-                    print(f'Could not add dataset: {err}.')
-            lock.release()
-
-        pool.close()
-        pool.join()
+                        pending.append((i,inc,paths_out,pool.apply_async(self._job,([(func,datasets,args)],datasets_in,
+                                                                                    os.path.join(tmp.name,f'{i}')))))
+                    while len(pending) > N_pending or (i == len(increments)-1 and pending):
+                        i_,inc_,paths_,r = pending.popleft()
+                        r = r.get()[0]
+                        if r is not None: write(f,inc_,paths_,r)
+                        for fname in glob.glob(os.path.join(tmp.name,f'{i_}_*.npy')):
+                            os.remove(fname)
+            finally:
+                tmp.cleanup()
 
 
     def save_XDMF(self):
@@ -1191,9 +2210,17 @@ class Result:
 
         The view is not taken into account, i.e. the content of the
         whole file will be included.
+
+        Datasets of multiple phases/homogenizations are joined and,
+        together with datasets of multiple constituents, mapped to the
+        cells via coordinates stored in an additional HDF5 file.
+        Components of datasets with up to ten components share one
+        index per cell, datasets with more components (not supported
+        by XDMF functions) require one index per cell and component.
+        Datasets that are not available for all cells are omitted.
         """
-        if self.N_constituents != 1 or len(self.phases) != 1 or not self.structured:
-            raise TypeError('XDMF output requires homogeneous grid')
+        if not self.structured:
+            raise TypeError('XDMF output requires structured grid')
 
 
         attribute_type_map = defaultdict(lambda:'Matrix', ( ((),'Scalar'), ((3,),'Vector'), ((3,3),'Tensor')) )
@@ -1203,6 +2230,83 @@ class Result:
             if dtype in np.sctypes['uint']:  return 'UInt'
             if dtype in np.sctypes['float']: return 'Float'
 
+        self._get_index()
+        N_cells = np.prod(self.cells)
+        mapping = self._get_mapping()
+        fname_coordinates = self.fname.with_suffix('.xdmf.hdf5').name
+
+        indices = {}
+        coordinates = {}
+
+        def cell_index(keys):
+            """Return row index into the joined datasets for each cell, None for identity."""
+            if keys not in indices:
+                index = np.full(N_cells,-1)
+                offset = 0
+                for key,N in keys:
+                    points,positions = mapping[key]
+                    index[points] = offset + positions
+                    offset += N
+                indices[keys] = False if np.any(index < 0) else \
+                                None if np.array_equal(index,np.arange(N_cells)) and offset == N_cells else \
+                                index
+            return indices[keys]
+
+        def data_item(parent,paths,keys,shape,dtype):
+            """Add (composed) data item for datasets given by their paths."""
+            index = cell_index(keys)
+            if index is False: return False
+            size = int(np.prod(shape))
+            attrib = {'Format':     'HDF',
+                      'NumberType': number_type_map(dtype),
+                      'Precision':  f'{dtype.itemsize}'}
+            dims = '{} {} {} {}'.format(*self.cells,size)
+            if index is None:
+                item = ET.SubElement(parent,'DataItem')
+                item.attrib = dict(attrib,Dimensions=dims)
+                item.text = f'{os.path.split(self.fname)[1]}:{paths[0]}'
+                return True
+
+            if 1 < size <= 10:                                                  # XdmfExpr knows only $0 to $9
+                key,components = keys,[np.unravel_index(k,shape) for k in range(size)]
+            else:
+                key,components = (keys,size),[None]
+                index = (index[:,np.newaxis]*size+np.arange(size)).reshape(-1)
+            if key not in coordinates:
+                coordinates[key] = (f'/coordinates{len(coordinates)}',index.reshape(-1,1))
+            name = coordinates[key][0]
+            if len(components) > 1:
+                parent = ET.SubElement(parent,'DataItem')
+                parent.attrib = {'ItemType':   'Function',
+                                 'Function':   'JOIN('+' , '.join([f'${k}' for k in range(size)])+')',  # interlace
+                                 'Dimensions': dims}
+            for component in components:
+                n = size if component is None else 1
+                item = ET.SubElement(parent,'DataItem')
+                item.attrib = {'ItemType':'Coordinates','Dimensions':dims if component is None else f'{N_cells}'}
+                index_item = ET.SubElement(item,'DataItem')
+                index_item.attrib = {'Format':'HDF','NumberType':'Int','Precision':'8','Dimensions':f'{N_cells*n} 1'}
+                index_item.text = f'{fname_coordinates}:{name}'
+                if len(paths) > 1:
+                    item = ET.SubElement(item,'DataItem')
+                    item.attrib = {'ItemType':   'Function',
+                                   'Function':   'JOIN('+' ; '.join([f'${i}' for i in range(len(paths))])+')',  # concatenate
+                                   'Dimensions': f'{sum(N for _,N in keys)*n}'}
+                for pa,(_,N) in zip(paths,keys):
+                    if component is not None:
+                        item_ = ET.SubElement(item,'DataItem')
+                        item_.attrib = {'ItemType':'HyperSlab','Dimensions':f'{N}'}
+                        selection = ET.SubElement(item_,'DataItem')
+                        selection.attrib = {'Format':'XML','Dimensions':f'3 {len(shape)+1}'}
+                        selection.text = ' '.join(map(str,(0,)+component                        # start
+                                                          +(1,)*(len(shape)+1)                  # stride
+                                                          +(N,)+(1,)*len(shape)))               # count
+                    source = ET.SubElement(item if component is None else item_,'DataItem')
+                    source.attrib = dict(attrib,Dimensions=f'{N*n}' if component is None else \
+                                                           ' '.join(map(str,(N,)+tuple(shape))))
+                    source.text = f'{os.path.split(self.fname)[1]}:{pa}'
+            return True
+
 
         xdmf=ET.Element('Xdmf')
         xdmf.attrib={'Version':  '2.0',
@@ -1226,33 +2330,32 @@ class Result:
         attributes = []
         data_items = []
 
-        for inc in self.increments:
-
-            grid=ET.SubElement(collection,'Grid')
-            grid.attrib = {'GridType': 'Uniform',
-                           'Name':      inc}
+        with self._open():
+            for inc in self.increments:
 
-            topology=ET.SubElement(grid, 'Topology')
-            topology.attrib={'TopologyType': '3DCoRectMesh',
-                             'Dimensions':   '{} {} {}'.format(*self.cells+1)}
+                grid=ET.SubElement(collection,'Grid')
+                grid.attrib = {'GridType': 'Uniform',
+                               'Name':      inc}
 
-            geometry=ET.SubElement(grid, 'Geometry')
-            geometry.attrib={'GeometryType':'Origin_DxDyDz'}
+                topology=ET.SubElement(grid, 'Topology')
+                topology.attrib={'TopologyType': '3DCoRectMesh',
+                                 'Dimensions':   '{} {} {}'.format(*self.cells+1)}
 
-            origin=ET.SubElement(geometry, 'DataItem')
-            origin.attrib={'Format':     'XML',
-                           'NumberType': 'Float',
-                           'Dimensions': '3'}
-            origin.text="{} {} {}".format(*self.origin)
+                geometry=ET.SubElement(grid, 'Geometry')
+                geometry.attrib={'GeometryType':'Origin_DxDyDz'}
 
-            delta=ET.SubElement(geometry, 'DataItem')
-            delta.attrib={'Format':     'XML',
-                          'NumberType': 'Float',
-                          'Dimensions': '3'}
-            delta.text="{} {} {}".format(*(self.size/self.cells))
+                origin=ET.SubElement(geometry, 'DataItem')
+                origin.attrib={'Format':     'XML',
+                               'NumberType': 'Float',
+                               'Dimensions': '3'}
+                origin.text="{} {} {}".format(*self.origin)
 
+                delta=ET.SubElement(geometry, 'DataItem')
+                delta.attrib={'Format':     'XML',
+                              'NumberType': 'Float',
+                              'Dimensions': '3'}
+                delta.text="{} {} {}".format(*(self.size/self.cells))
 
-            with h5py.File(self.fname,'r') as f:
                 attributes.append(ET.SubElement(grid, 'Attribute'))
                 attributes[-1].attrib={'Name':          'u / m',
                                        'Center':        'Node',
@@ -1264,98 +2367,519 @@ class Result:
                 data_items[-1].text=f'{os.path.split(self.fname)[1]}:/{inc}/geometry/u_n'
 
                 for o,p in zip(['phases','homogenizations'],['out_type_ph','out_type_ho']):
-                    for oo in getattr(self,o):
-                        for pp in getattr(self,p):
-                            g = '/'.join([inc,o[:-1],oo,pp])
-                            for l in f[g]:
-                                name = '/'.join([g,l])
-                                shape = f[name].shape[1:]
-                                dtype = f[name].dtype
-
-                                if dtype not in np.sctypes['int']+np.sctypes['uint']+np.sctypes['float']: continue
-                                unit = f[name].attrs['Unit'] if h5py3 else f[name].attrs['Unit'].decode()
-
-                                attributes.append(ET.SubElement(grid, 'Attribute'))
-                                attributes[-1].attrib={'Name':          name.split('/',2)[2]+f' / {unit}',
+                    for pp in getattr(self,p):
+                        labels = defaultdict(list)
+                        for oo in getattr(self,o):
+                            for l,(shape,dtype) in self._index.get('/'.join([inc,o[:-1],oo,pp]),{}).items():
+                                labels[l].append((oo,shape,dtype))
+                        for l,datasets in labels.items():
+                            shape,dtype = datasets[0][1][1:],datasets[0][2]
+                            if dtype not in np.sctypes['int']+np.sctypes['uint']+np.sctypes['float'] \
+                               or any(d[1][1:] != shape or d[2] != dtype for d in datasets): continue
+                            paths = ['/'.join([inc,o[:-1],oo,pp,l]) for oo,_,_ in datasets]
+                            unit = self._get_attributes(paths[0])['Unit']
+                            joined = f'{o[:-1]}/{pp}/{l}' if len(paths) > 1 else paths[0].split('/',2)[2]
+                            for c in range(self.N_constituents if o == 'phases' else 1):
+                                keys = tuple((('phase',oo,c) if o == 'phases' else ('homogenization',oo),shape_[0])
+                                             for oo,shape_,_ in datasets)
+                                prefix = f'constituent{c}/' if o == 'phases' and self.N_constituents > 1 else ''
+                                attributes.append(ET.Element('Attribute'))
+                                attributes[-1].attrib={'Name':          f'{prefix}{joined} / {unit}',
                                                        'Center':       'Cell',
                                                        'AttributeType': attribute_type_map[shape]}
-                                data_items.append(ET.SubElement(attributes[-1], 'DataItem'))
-                                data_items[-1].attrib={'Format':     'HDF',
-                                                       'NumberType': number_type_map(dtype),
-                                                       'Precision':  f'{dtype.itemsize}',
-                                                       'Dimensions': '{} {} {} {}'.format(*self.cells,1 if shape == () else
-                                                                                                      np.prod(shape))}
-                                data_items[-1].text=f'{os.path.split(self.fname)[1]}:{name}'
+                                if data_item(attributes[-1],paths,keys,shape,dtype):
+                                    grid.append(attributes[-1])
 
+        if coordinates:
+            with h5py.File(fname_coordinates,'w') as f:
+                for name,index in coordinates.values():
+                    f.create_dataset(name,data=index)
         with open(self.fname.with_suffix('.xdmf').name,'w') as f:
             f.write(xml.dom.minidom.parseString(ET.tostring(xdmf).decode()).toprettyxml())
 
 
-    def save_VTK(self,labels=[],mode='cell'):
-        """
-        Export to vtk cell/point data.
-
-        Parameters
-        ----------
-        labels : str or list of, optional
-            Labels of the datasets to be exported.
-        mode : str, either 'cell' or 'point'
-            Export in cell format or point format.
-            Defaults to 'cell'.
-
-        """
+    def _VTK_geometry(self,mode):
+        """Return VTK object with the initial geometry of all points/cells."""
         if mode.lower()=='cell':
 
             if self.structured:
                 v = VTK.from_rectilinear_grid(self.cells,self.size,self.origin)
             else:
-                with h5py.File(self.fname,'r') as f:
+                with self._open() as f:
                     v = VTK.from_unstructured_grid(f['/geometry/x_n'][()],
                                                    f['/geometry/T_c'][()]-1,
                                                    f['/geometry/T_c'].attrs['VTK_TYPE'] if h5py3 else \
                                                    f['/geometry/T_c'].attrs['VTK_TYPE'].decode())
         elif mode.lower()=='point':
             v = VTK.from_poly_data(self.coordinates0_point)
+        return v
 
-        N_digits = int(np.floor(np.log10(max(1,int(self.increments[-1][3:])))))+1
 
-        for inc in util.show_progress(self.iterate('increments'),len(self.visible['increments'])):
+    def _VTK_fields(self,labels,mode):
+        """
+        Return the fields to export for each visible increment.
 
-            viewed_backup_ho = self.visible['homogenizations'].copy()
-            self.view('homogenizations',False)
-            for label in (labels if isinstance(labels,list) else [labels]):
-                for o in self.iterate('out_type_ph'):
+        Fields are given as (name,paths,constituent) and are determined
+        from the index, i.e. without changing the view.
+        """
+        self._get_index()
+        fields = []
+        for inc in self.visible['increments']:
+            fields_inc = []
+            for label in labels:
+                for o in self.visible['out_type_ph']:
                     for c in range(self.N_constituents):
                         prefix = '' if self.N_constituents == 1 else f'constituent{c}/'
+                        paths = [f'{inc}/phase/{ph}/{o}/{label}' for ph in self.visible['phases']
+                                 if label in self._index.get(f'{inc}/phase/{ph}/{o}',{})]
                         if o != 'mechanics':
-                            for _ in self.iterate('phases'):
-                                path = self.get_dataset_location(label)
-                                if len(path) == 0:
-                                    continue
-                                array = self.read_dataset(path,c)
-                                v.add(array,prefix+path[0].split('/',1)[1]+f' / {self._get_attribute(path[0],"Unit")}')
-                        else:
-                            paths = self.get_dataset_location(label)
-                            if len(paths) == 0:
-                                continue
-                            array = self.read_dataset(paths,c)
-                            ph_name = re.compile(r'(?<=(phase\/))(.*?)(?=(mechanics))')              # identify  phase name
-                            dset_name = prefix+re.sub(ph_name,r'',paths[0].split('/',1)[1])          # remove phase name
-                            v.add(array,dset_name+f' / {self._get_attribute(paths[0],"Unit")}')
-            self.view('homogenizations',viewed_backup_ho)
-
-            viewed_backup_ph = self.visible['phases'].copy()
-            self.view('phases',False)
-            for label in (labels if isinstance(labels,list) else [labels]):
-                for _ in self.iterate('out_type_ho'):
-                    paths = self.get_dataset_location(label)
-                    if len(paths) == 0:
-                        continue
-                    array = self.read_dataset(paths)
-                    v.add(array,paths[0].split('/',1)[1]+f' / {self._get_attribute(paths[0],"Unit")}')
-            self.view('phases',viewed_backup_ph)
-
-            u = self.read_dataset(self.get_dataset_location('u_n' if mode.lower() == 'cell' else 'u_p'))
-            v.add(u,'u')
-
-            v.save(f'{self.fname.stem}_inc{inc[3:].zfill(N_digits)}')
+                            fields_inc += [(prefix+pa.split('/',1)[1]+f' / {self._get_attribute(pa,"Unit")}',[pa],c)
+                                           for pa in paths]
+                        elif paths:
+                            fields_inc.append((prefix+f'phase/{o}/{label} / {self._get_attribute(paths[0],"Unit")}',
+                                               paths,c))                                            # phase name removed
+            for label in labels:
+                for o in self.visible['out_type_ho']:
+                    paths = [f'{inc}/homogenization/{ho}/{o}/{label}' for ho in self.visible['homogenizations']
+                             if label in self._index.get(f'{inc}/homogenization/{ho}/{o}',{})]
+                    if paths:
+                        fields_inc.append((paths[0].split('/',1)[1]+f' / {self._get_attribute(paths[0],"Unit")}',
+                                           paths,0))
+            fields_inc.append(('u',[f'{inc}/geometry/'+('u_n' if mode.lower() == 'cell' else 'u_p')],0))
+            fields.append(fields_inc)
+        return fields
+
+
+    @staticmethod
+    def _save_VTK_job(result,increments,mode,pooled,compress,appended):
+        """Write one VTK file for each tuple of (file name,fields)."""
+        geometry = result._VTK_geometry(mode)
+        for fname,fields in (increments if pooled else util.show_progress(increments)):
+            v = VTK(geometry.vtk_data.NewInstance())
+            v.vtk_data.ShallowCopy(geometry.vtk_data)                                               # share geometry, not data
+            with result._open():
+                for name,paths,c in fields:
+                    v.add(result.read_dataset(paths,c),name)
+            v.save(fname,parallel=not pooled,compress=compress,appended=appended)                   # pool workers cannot fork
+        return [None]*len(increments)
+
+
+    def save_VTK(self,labels=[],mode='cell',parallel=False,pvd=False,compress=True,appended=False):
+        """
+        Export to vtk cell/point data.
+
+        Parameters
+        ----------
+        labels : str or list of, optional
+            Labels of the datasets to be exported.
+        mode : str, either 'cell' or 'point'
+            Export in cell format or point format.
+            Defaults to 'cell'.
+        parallel : bool, optional
+            Export increments in parallel using the worker pool.
+            Defaults to False.
+        pvd : bool, optional
+            Additionally write a ParaView collection (.pvd) file that
+            references the files of all increments with their time.
+            Defaults to False.
+        compress : bool or {'zlib','lz4','lzma'}, optional
+            Compress with given algorithm, True selects zlib. Defaults to True.
+        appended : bool, optional
+            Store data as raw binary in appended section.
+            Defaults to False.
+
+        """
+        N_digits = int(np.floor(np.log10(max(1,int(self.increments[-1][3:])))))+1
+        ext = '.vtp' if mode.lower() == 'point' else ('.vtr' if self.structured else '.vtu')
+        fnames = [Path.cwd()/f'{self.fname.stem}_inc{inc[3:].zfill(N_digits)}{ext}' for inc in self.visible['increments']]
+        fields = self._VTK_fields(labels if isinstance(labels,list) else [labels],mode)
+
+        self._get_mapping()                                                                         # cached mapping is passed to workers
+        self._map_increments(self._save_VTK_job,list(zip(fnames,fields)),
+                             (mode,parallel,compress,appended),parallel)
+
+        if pvd:
+            vtk_file = ET.Element('VTKFile',{'type':'Collection','version':'0.1'})
+            collection = ET.SubElement(vtk_file,'Collection')
+            for inc,fname in zip(self.visible['increments'],fnames):
+                ET.SubElement(collection,'DataSet',{'timestep':str(self.times[self.increments.index(inc)]),
+                                                    'part':'0','file':fname.name})
+            with open(self.fname.with_suffix('.pvd').name,'w') as f:
+                f.write(xml.dom.minidom.parseString(ET.tostring(vtk_file).decode()).toprettyxml())
+
+
+    def save_DADF5(self,fname,output='*',selection=None):
+        """
+        Save visible increments, phases, and homogenizations to a new DADF5 file.
+
+        Datasets are copied without decompressing and recompressing them
+        unless a spatial selection is given.
+
+        Parameters
+        ----------
+        fname : str or pathlib.Path
+            Name of the new DADF5 file.
+        output : str or list of str, optional
+            Labels of the datasets to be saved, supports ? and * wildcards.
+            Defaults to '*'.
+        selection : slice or tuple of slice, optional
+            Cells along x, y, z to be saved. Requires a structured grid.
+            Nodal data is only saved for slices without step.
+            Defaults to None, i.e. all cells.
+
+        """
+        if selection is not None and not self.structured:
+            raise TypeError('spatial selection requires structured grid')
+        if Path(fname).absolute() == self.fname:
+            raise ValueError('cannot overwrite opened file')
+
+        output_ = [output] if isinstance(output,str) else output
+        rows = defaultdict(lambda: np.zeros(0,dtype=int))                                           # rows of datasets to save, per group
+
+        def copy(f_in,f_out,path,rows):
+            """Copy dataset, either unchanged or selected rows."""
+            src = f_in[path]
+            if rows is None:
+                f_in.copy(src,f_out.require_group(os.path.dirname(path)),os.path.basename(path))
+            else:
+                filters = {} if src.chunks is None or len(rows) == 0 else \
+                          {'chunks':(min(src.chunks[0],len(rows)),)+src.chunks[1:],
+                           'compression':src.compression,'compression_opts':src.compression_opts,
+                           'shuffle':src.shuffle,'fletcher32':src.fletcher32}
+                dst = f_out.require_group(os.path.dirname(path)) \
+                           .create_dataset(os.path.basename(path),data=LazyDataset._read_rows(src,rows),**filters)
+                for k,v in src.attrs.items(): dst.attrs[k] = v
+
+        with self._open() as f_in, h5py.File(fname,'w') as f_out:
+            for k,v in f_in.attrs.items(): f_out.attrs[k] = v
+            for g in f_in:
+                if not re.fullmatch('inc[0-9]+',g) and (selection is None or g not in ['geometry','mapping']):
+                    f_in.copy(g,f_out)
+
+            if selection is not None:
+                item = (selection if isinstance(selection,tuple) else (selection,))+(slice(None),)*3
+                ranges = [range(c)[s if isinstance(s,slice) else slice(s,s+1)] for c,s in zip(self.cells,item[:3])]
+                if any(len(r) == 0 or r.step < 0 for r in ranges):
+                    raise ValueError(f'invalid selection {selection}')
+                step = np.array([r.step for r in ranges])
+                delta = self.size/self.cells
+                points = np.arange(np.prod(self.cells)).reshape(self.cells,order='F')[np.ix_(*ranges)].flatten(order='F')
+                nodes = np.arange(np.prod(self.cells+1)).reshape(self.cells+1,order='F') \
+                          [np.ix_(*[range(r.start,r.start+len(r)+1) for r in ranges])].flatten(order='F') \
+                          if np.all(step == 1) else None
+
+                geometry = f_out.create_group('geometry')
+                for k,v in f_in['geometry'].attrs.items(): geometry.attrs[k] = v
+                geometry.attrs['cells' if 'cells' in geometry.attrs else 'grid'] = np.array([len(r) for r in ranges])
+                geometry.attrs['size'] = np.array([len(r) for r in ranges])*step*delta
+                geometry.attrs['origin'] = self.origin + (np.array([r.start for r in ranges])+.5-.5*step)*delta
+
+                for ty in ['phase','homogenization']:
+                    mapping = f_in[f'mapping/{ty}'][()][points]
+                    for name in np.unique(mapping['Name']):
+                        m = mapping['Name'] == name
+                        rows[f'{ty}/{name.decode()}'] = np.unique(mapping['Position'][m])
+                        mapping['Position'][m] = np.searchsorted(rows[f'{ty}/{name.decode()}'],mapping['Position'][m])
+                    dst = f_out.require_group('mapping').create_dataset(ty,data=mapping)
+                    for k,v in f_in[f'mapping/{ty}'].attrs.items(): dst.attrs[k] = v
+
+            for inc in self.visible['increments']:
+                for k,v in f_in[inc].attrs.items(): f_out.require_group(inc).attrs[k] = v
+                for label in f_in[f'{inc}/geometry'] if f'{inc}/geometry' in f_in else []:
+                    if not any(glob.fnmatch.fnmatch(label,o) for o in output_): continue
+                    N = f_in[f'{inc}/geometry/{label}'].shape[0]
+                    if selection is None:
+                        copy(f_in,f_out,f'{inc}/geometry/{label}',None)
+                    elif N == np.prod(self.cells) or (N == np.prod(self.cells+1) and nodes is not None):
+                        copy(f_in,f_out,f'{inc}/geometry/{label}',points if N == np.prod(self.cells) else nodes)
+                for ty,visible,out_type in [('phase','phases','out_type_ph'),('homogenization','homogenizations','out_type_ho')]:
+                    for name in f_in[f'{inc}/{ty}'] if f'{inc}/{ty}' in f_in else []:
+                        f_out.require_group(f'{inc}/{ty}/{name}')
+                        if name not in self.visible[visible]: continue
+                        for o in f_in[f'{inc}/{ty}/{name}']:
+                            if o not in self.visible[out_type]: continue
+                            f_out.require_group(f'{inc}/{ty}/{name}/{o}')
+                            for label in f_in[f'{inc}/{ty}/{name}/{o}']:
+                                if any(glob.fnmatch.fnmatch(label,o_) for o_ in output_):
+                                    copy(f_in,f_out,f'{inc}/{ty}/{name}/{o}/{label}',
+                                         None if selection is None else rows[f'{ty}/{name}'])
+
+
+class LazyDataset:
+    """
+    Dataset for all points/cells that is read on access.
+
+    Returned by Result.lazy_dataset.
+    """
+
+    def __init__(self,result,path,c=0,plain=False):
+        """
+        New lazy dataset.
+
+        Parameters
+        ----------
+        result : damask.Result
+            Result containing the datasets.
+        path : list of strings
+            The name of the datasets to consider.
+        c : int, optional
+            The constituent to consider. Defaults to 0.
+        plain: boolean, optional
+            Convert into plain numpy datatype. Defaults to False.
+
+        """
+        self._result = result
+        self._path   = path
+        self._c      = c
+        self._plain  = plain
+
+        shape,self.dtype = result._index[os.path.dirname(path[0])][os.path.basename(path[0])]
+        self._geometry = path[0].split('/')[1] == 'geometry'
+        self.shape = shape if self._geometry else \
+                     (result.N_materialpoints,) + (shape[1:] if len(shape) > 1 else (1,))
+        if plain and self.dtype.names is not None:
+            self.shape += (len(self.dtype.names),)
+            self.dtype  = np.dtype('float64')
+
+
+    def __len__(self):
+        """Number of points/cells."""
+        return self.shape[0]
+
+
+    def __array__(self,dtype=None):
+        """Read all data."""
+        return self[:] if dtype is None else self[:].astype(dtype)
+
+
+    def __getitem__(self,item):
+        """Read data of material points selected by NumPy-style index."""
+        item = item if isinstance(item,tuple) else (item,)
+        points = np.arange(len(self))[item[0]]
+        data = self._read(np.atleast_1d(points))
+        return (data[0] if np.ndim(points) == 0 else data)[(Ellipsis,) if len(item) == 1 else
+                                                           ((slice(None),) if np.ndim(points) else ())+item[1:]]
+
+
+    @property
+    def points(self):
+        """Material points covered by the datasets."""
+        if self._geometry: return np.arange(len(self))
+        mapping = self._result._get_mapping()
+        return np.unique(np.concatenate([self._locate(mapping,pa)[0] for pa in self._path]))
+
+
+    @property
+    def grid(self):
+        """Indexer by cell (x,y,z) for structured grids."""
+        if not self._result.structured or self._geometry:
+            raise TypeError('Selection by cell requires structured grid')
+        return _GridIndexer(self)
+
+
+    def _locate(self,mapping,path):
+        """Material points and positions in the dataset of a path."""
+        ty,label = path.split('/')[1:3]
+        return mapping.get((ty,label,self._c) if ty == 'phase' else (ty,label),(np.array([],int),)*2)
+
+
+    def _read(self,points):
+        """
+        Read data of selected material points.
+
+        Parameters
+        ----------
+        points : numpy.ndarray of int
+            Material points.
+
+        """
+        with self._result._open() as f:
+            if self._geometry:
+                u,inv = np.unique(points,return_inverse=True)
+                return self._read_rows(f[self._path[0]],u)[inv]
+
+            shape,dtype = self._result._index[os.path.dirname(self._path[0])][os.path.basename(self._path[0])]
+            data = np.full((len(points),)+(shape[1:] if len(shape) > 1 else (1,)),np.nan,dtype=dtype)
+            mapping = self._result._get_mapping()
+            for pa in self._path:
+                p,u = self._locate(mapping,pa)
+                if len(p) == 0: continue
+                loc = np.clip(np.searchsorted(p,points),0,len(p)-1)
+                hit = p[loc] == points
+                if not np.any(hit): continue
+                positions,inv = np.unique(u[loc[hit]],return_inverse=True)
+                data[hit] = self._read_rows(f[pa],positions).reshape((-1,)+data.shape[1:])[inv]
+
+        return data.view(('float64',len(dtype.names))) if self._plain and dtype.names is not None else \
+               data
+
+
+    @staticmethod
+    def _read_rows(dataset,rows):
+        """Read sorted rows, either as hyperslab or as point selection for sparse rows."""
+        if len(rows) == 0:
+            return dataset[0:0]
+        elif rows[-1]-rows[0]+1 <= 4*len(rows):
+            return dataset[rows[0]:rows[-1]+1][rows-rows[0]]
+        else:
+            return dataset[rows]
+
+
+class _GridIndexer:
+    """Index LazyDataset by cell."""
+
+    def __init__(self,dataset):
+        self._dataset = dataset
+
+    def __getitem__(self,item):
+        """Read data of cells selected by NumPy-style index along x, y, z (and data dimensions)."""
+        item = item if isinstance(item,tuple) else (item,)
+        cells = self._dataset._result.cells
+        points = np.arange(np.prod(cells)).reshape(tuple(cells),order='F')[item[:3]]
+        data = self._dataset[np.ravel(points)]
+        return data.reshape(np.shape(points)+data.shape[1:])[(slice(None),)*np.ndim(points)+item[3:]]
+
+
+class _Formula:
+    """
+    Formula for Result.add_calculation parsed once.
+
+    Formulas consisting only of arithmetic, comparisons, numbers, datasets,
+    and elementwise functions are evaluated with numexpr (if installed) or
+    with NumPy reusing temporary arrays. Others are evaluated by eval.
+    """
+
+    _functions = ['sin','cos','tan','arcsin','arccos','arctan','arctan2','sinh','cosh','tanh',
+                  'arcsinh','arccosh','arctanh','log','log10','log1p','exp','expm1','sqrt','abs','where']
+    _operators = {ast.Add:np.add,ast.Sub:np.subtract,ast.Mult:np.multiply,ast.Div:np.true_divide,
+                  ast.Pow:np.power,ast.Mod:np.remainder,ast.BitAnd:np.bitwise_and,ast.BitOr:np.bitwise_or,
+                  ast.USub:np.negative,ast.Invert:np.invert,
+                  ast.Lt:np.less,ast.LtE:np.less_equal,ast.Gt:np.greater,ast.GtE:np.greater_equal,
+                  ast.Eq:np.equal,ast.NotEq:np.not_equal}
+    _constants = (ast.Constant,) if sys.version_info >= (3,8) else (ast.Num,ast.NameConstant)
+    _numexpr_types = '?bhilqIfdFD'                                                                  # others are not supported by numexpr
+
+    def __init__(self,formula):
+        self.formula = formula
+        self.labels = list(dict.fromkeys(re.findall(r'#(.*?)#',formula)))
+        expression = formula
+        for i,label in enumerate(self.labels):
+            expression = expression.replace(f'#{label}#',f'_d{i}')
+        self.tree = ast.parse(expression.strip(),mode='eval')
+        self.elementwise = all(self._elementwise(n) for n in ast.walk(self.tree))
+        if self.elementwise:
+            self.tree = _Formula._Functions().visit(self.tree)
+            self.expression = re.sub(r'\bnp\.','',expression.strip())                              # ast.unparse requires python 3.9
+
+
+    class _Functions(ast.NodeTransformer):
+        """Replace 'np.func' by 'func'."""
+
+        def visit_Attribute(self,node):
+            return ast.copy_location(ast.Name(id=node.attr,ctx=ast.Load()),node)
+
+
+    def _elementwise(self,node):
+        if isinstance(node,ast.Call):
+            f = node.func
+            return not node.keywords and \
+                   (isinstance(f,ast.Name) and f.id == 'abs' or
+                    isinstance(f,ast.Attribute) and isinstance(f.value,ast.Name) and f.value.id == 'np' \
+                                                and f.attr in self._functions)
+        elif isinstance(node,ast.Attribute):
+            return isinstance(node.value,ast.Name) and node.value.id == 'np' and node.attr in self._functions
+        elif isinstance(node,ast.Name):
+            return node.id in ['np','abs'] or re.fullmatch(r'_d\d+',node.id) is not None
+        elif isinstance(node,self._constants):
+            return isinstance(self._value(node),(int,float,bool))
+        elif isinstance(node,ast.Compare):
+            return len(node.ops) == 1 and type(node.ops[0]) in self._operators
+        elif isinstance(node,(ast.BinOp,ast.UnaryOp)):
+            return type(node.op) in self._operators
+        else:
+            return isinstance(node,(ast.Expression,ast.Load,*self._operators))
+
+
+    @staticmethod
+    def _value(node):
+        """Value of constant node (ast.Num of python 3.7 has no attribute value)."""
+        return node.n if type(node).__name__ == 'Num' else node.value
+
+
+    @staticmethod
+    def _broadcast_shape(shapes):
+        """Shape resulting from broadcasting (numpy.broadcast_shapes requires numpy 1.20)."""
+        return np.broadcast(*[np.broadcast_to(0,s) for s in shapes]).shape
+
+
+    def check(self,datasets):
+        """
+        Check compatibility of datasets with the formula.
+
+        Parameters
+        ----------
+        datasets : dict
+            Shape (including number of points) and dtype of the datasets.
+
+        """
+        if self.elementwise:
+            try:
+                self._broadcast_shape([datasets[l][0] for l in self.labels])
+            except ValueError:
+                raise ValueError(f'shapes {[datasets[l][0] for l in self.labels]} '
+                                 f'of datasets {self.labels} cannot be broadcast')
+            for l in self.labels:
+                if datasets[l][1].names is not None or datasets[l][1].kind not in 'biufc':
+                    raise TypeError(f'dataset "{l}" of type {datasets[l][1]} is not numeric')
+
+
+    def __call__(self,data):
+        """
+        Evaluate formula.
+
+        Parameters
+        ----------
+        data : dict
+            Data of the datasets, keys are the labels.
+
+        """
+        data_ = {f'_d{i}':data[l] for i,l in enumerate(self.labels)}
+        if not self.elementwise:
+            return eval(compile(self.tree,'<formula>','eval'),globals(),data_)
+        if all(d.dtype.char in self._numexpr_types for d in data_.values()):
+            try:
+                import numexpr
+                return numexpr.evaluate(self.expression,data_,{})
+            except ImportError:
+                pass
+        return np.asarray(self._evaluate(self.tree.body,data_)[0])
+
+
+    def _evaluate(self,node,data):
+        """Evaluate node, returns value and whether it is a temporary array that can be overwritten."""
+        if isinstance(node,self._constants):
+            return self._value(node),False
+        elif isinstance(node,ast.Name):
+            return data[node.id],False
+        elif isinstance(node,ast.UnaryOp):
+            return self._ufunc(self._operators[type(node.op)],[self._evaluate(node.operand,data)])
+        elif isinstance(node,ast.BinOp):
+            return self._ufunc(self._operators[type(node.op)],[self._evaluate(n,data) for n in [node.left,node.right]])
+        elif isinstance(node,ast.Compare):
+            return self._ufunc(self._operators[type(node.ops[0])],[self._evaluate(n,data) for n in [node.left]+node.comparators])
+        elif node.func.id == 'where':
+            return np.where(*[self._evaluate(n,data)[0] for n in node.args]),True
+        else:
+            return self._ufunc(getattr(np,node.func.id),[self._evaluate(n,data) for n in node.args])
+
+
+    @staticmethod
+    def _ufunc(ufunc,args):
+        """Apply ufunc, store result in a temporary argument of matching shape and dtype if possible."""
+        values = [a for a,_ in args]
+        shape = _Formula._broadcast_shape([np.shape(v) for v in values])
+        dtype = ufunc(*[v[:0] if np.ndim(v) > 0 else v for v in values]).dtype                        # result type from empty arrays
+        for v,temporary in args:
+            if temporary and v.shape == shape and v.dtype == dtype:
+                return ufunc(*values,out=v),True
+        return ufunc(*values),True
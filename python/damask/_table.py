@@ -1,5 +1,11 @@
 import re
 import copy
+import json
+import struct
+import shutil
+import zipfile
+import tempfile
+from pathlib import Path
 
 import pandas as pd
 import numpy as np
@@ -13,10 +19,13 @@ class Table:
         """
         New spreadsheet.
 
+        Each labeled quantity is stored as individual numpy.ndarray of shape (N,)+shape.
+
         Parameters
         ----------
-        data : numpy.ndarray or pandas.DataFrame
+        data : numpy.ndarray, pandas.DataFrame, or dict of numpy.ndarray
             Data. Column labels from a pandas.DataFrame will be replaced.
+            Arrays in a dict are stored without copying.
         shapes : dict with str:tuple pairs
             Shapes of the columns. Example 'F':(3,3) for a deformation gradient.
         comments : str or iterable of str, optional
@@ -25,21 +34,25 @@ class Table:
         """
         comments_ = [comments] if isinstance(comments,str) else comments
         self.comments = [] if comments_ is None else [c for c in comments_]
-        self.data = pd.DataFrame(data=data)
         self.shapes = { k:(v,) if isinstance(v,(np.int,int)) else v for k,v in shapes.items() }
-        self._label_uniform()
+        if isinstance(data,dict):
+            self._data = {label:np.asarray(data[label]).reshape((-1,)+shape) for label,shape in self.shapes.items()}
+            self._frame = None
+        else:
+            self.data = data
 
     def __repr__(self):
         """Brief overview."""
         return '\n'.join(['# '+c for c in self.comments])+'\n'+self.data.__repr__()
 
     def __getitem__(self,item):
-        """Return slice according to item."""
-        return self.__class__(data=self.data[item],shapes=self.shapes,comments=self.comments)
+        """Return slice of rows according to item."""
+        return self.__class__(data={label:d[item] for label,d in self._data.items()},
+                              shapes=self.shapes,comments=self.comments)
 
     def __len__(self):
         """Number of rows."""
-        return len(self.data)
+        return len(next(iter(self._data.values()))) if self._data else 0
 
     def __copy__(self):
         """Create deep copy."""
@@ -48,21 +61,56 @@ class Table:
     copy = __copy__
 
 
-    def _label_discrete(self):
-        """Label data individually, e.g. v v v ==> 1_v 2_v 3_v."""
-        labels = []
+    def _dup(self):
+        """Create copy that shares the (unmodified) data."""
+        dup = self.__class__.__new__(self.__class__)
+        dup.comments = self.comments.copy()
+        dup.shapes   = self.shapes.copy()
+        dup._data    = self._data.copy()
+        dup._frame   = None
+        return dup
+
+
+    @property
+    def data(self):
+        """
+        Data as pandas.DataFrame with uniform labels, e.g. v v v.
+
+        The DataFrame is created on first access and is read-only.
+        Assign a DataFrame to replace the data.
+
+        """
+        if self._frame is None:
+            self._frame = self._to_frame()
+            for block in self._frame._mgr.blocks:
+                block.values.flags.writeable = False
+        return self._frame
+
+    @data.setter
+    def data(self,data):
+        data_ = pd.DataFrame(data=data)
+        self._data = {}
+        i = 0
         for label,shape in self.shapes.items():
             size = int(np.prod(shape))
-            labels += [('' if size == 1 else f'{i+1}_')+label for i in range(size)]
-        self.data.columns = labels
+            self._data[label] = np.ascontiguousarray(data_.iloc[:,i:i+size].to_numpy()).reshape((-1,)+shape)
+            i += size
+        if i != data_.shape[1]:
+            raise ValueError(f'shapes require {i} columns, data has {data_.shape[1]}')
+        self._frame = None
 
 
-    def _label_uniform(self):
-        """Label data uniformly, e.g. 1_v 2_v 3_v ==> v v v."""
-        labels = []
-        for label,shape in self.shapes.items():
-            labels += [label] * int(np.prod(shape))
-        self.data.columns = labels
+    def _to_frame(self,rows=slice(None)):
+        """Create pandas.DataFrame with uniform labels from (the given rows of) the columns."""
+        frames = [pd.DataFrame(d[rows].reshape(len(d[rows]),-1),columns=[label]*int(np.prod(self.shapes[label])))
+                  for label,d in self._data.items()]
+        return pd.concat(frames,axis=1) if frames else pd.DataFrame()
+
+
+    def _write_rows(self,f):
+        """Write rows as space-separated values, in blocks to bound the size of the intermediate DataFrame."""
+        for i in range(0,len(self),2**16):
+            self._to_frame(slice(i,i+2**16)).to_csv(f,sep=' ',na_rep='nan',index=False,header=False)
 
 
     def _add_comment(self,label,shape,info):
@@ -73,7 +121,7 @@ class Table:
 
 
     @staticmethod
-    def load(fname):
+    def load(fname,labels=None,mmap=False):
         """
         Load from ASCII table file.
 
@@ -85,25 +133,104 @@ class Table:
         Vector data column labels are indicated by '1_v, 2_v, ..., n_v'.
         Tensor data column labels are indicated by '3x3:1_T, 3x3:2_T, ..., 3x3:9_T'.
 
+        Files with extension '.npz' (NumPy), '.parquet', or '.feather' (Apache Arrow,
+        requires pyarrow) are read as binary files written by Table.save.
+
+        Parameters
+        ----------
+        fname : file, str, or pathlib.Path
+            Filename or file for reading.
+        labels : str or iterable of str, optional
+            Labels of the columns to load. Defaults to all columns.
+        mmap : bool, optional
+            Memory-map the data of binary files instead of reading it.
+            For Feather files, only single-component columns are memory-mapped.
+            Defaults to False.
+
+        Returns
+        -------
+        loaded : damask.Table
+            Loaded table.
+
+        """
+        labels_ = [labels] if isinstance(labels,str) else labels
+        suffix = Path(fname).suffix.lower() if isinstance(fname,(str,Path)) else None
+        if suffix == '.npz':
+            return Table._load_npz(fname,labels_,mmap)
+        elif suffix in ['.parquet','.feather']:
+            return Table._load_arrow(fname,labels_,mmap)
+
+        try:
+            f = open(fname)
+        except TypeError:
+            f = fname
+            f.seek(0)
+
+        comments,shapes,columns,N_columns = Table._read_header(f,labels_)
+        data = pd.read_csv(f,names=list(range(N_columns)),usecols=columns,sep=r'\s+')
+        return Table(data if columns is None else data[columns],shapes,comments)
+
+
+    @staticmethod
+    def iter_load(fname,chunksize,labels=None):
+        """
+        Load from table file in chunks.
+
+        The file format is determined as for Table.load.
+        Binary files are memory-mapped.
+
         Parameters
         ----------
         fname : file, str, or pathlib.Path
             Filename or file for reading.
+        chunksize : int
+            Maximum number of rows per chunk.
+        labels : str or iterable of str, optional
+            Labels of the columns to load. Defaults to all columns.
+
+        Yields
+        ------
+        chunk : damask.Table
+            Table with at most chunksize rows.
 
         """
+        labels_ = [labels] if isinstance(labels,str) else labels
+        suffix = Path(fname).suffix.lower() if isinstance(fname,(str,Path)) else None
+        if suffix == '.npz':
+            table = Table.load(fname,labels_,mmap=True)
+            for i in range(0,len(table),chunksize):
+                yield table[i:i+chunksize]
+            return
+        elif suffix in ['.parquet','.feather']:
+            yield from Table._iter_load_arrow(fname,chunksize,labels_)
+            return
+
         try:
             f = open(fname)
         except TypeError:
             f = fname
             f.seek(0)
 
+        try:
+            comments,shapes,columns,N_columns = Table._read_header(f,labels_)
+            with pd.read_csv(f,names=list(range(N_columns)),usecols=columns,sep=r'\s+',
+                             chunksize=chunksize) as reader:
+                for data in reader:
+                    yield Table(data if columns is None else data[columns],shapes,comments)
+        finally:
+            if f is not fname: f.close()
+
+
+    @staticmethod
+    def _read_header(f,labels):
+        """Read comments and column shapes from header of ASCII table file."""
         try:
             N_comment_lines,keyword = f.readline().strip().split(maxsplit=1)
             if keyword != 'header':
                 raise ValueError
             else:
                 comments = [f.readline().strip() for i in range(1,int(N_comment_lines))]
-                labels   = f.readline().split()
+                header   = f.readline().split()
         except ValueError:
             f.seek(0)
             comments = []
@@ -111,10 +238,10 @@ class Table:
             while line.startswith('#'):
                 comments.append(line.lstrip('#').strip())
                 line = f.readline().strip()
-            labels = line.split()
+            header = line.split()
 
         shapes = {}
-        for label in labels:
+        for label in header:
             tensor_column = re.search(r'[0-9,x]*?:[0-9]*?_',label)
             if tensor_column:
                 my_shape = tensor_column.group().split(':',1)[0].split('x')
@@ -126,10 +253,102 @@ class Table:
                 else:
                     shapes[label] = (1,)
 
-        data = pd.read_csv(f,names=list(range(len(labels))),sep=r'\s+')
+        if labels is None:
+            columns = None
+        else:
+            flat = Table._header_labels(shapes)
+            columns = [flat.index(l) for l in Table._header_labels({l:shapes[l] for l in labels})]
+            shapes = {l:shapes[l] for l in labels}
+
+        return comments,shapes,columns,len(header)
 
+
+    @staticmethod
+    def _load_npz(fname,labels,mmap):
+        """Load from NumPy .npz file."""
+        with np.load(fname,allow_pickle=False) as f:
+            comments = f['#comments'].tolist() if '#comments' in f.files else []
+            labels_ = [l for l in f.files if l != '#comments'] if labels is None else labels
+            if not mmap:
+                data = {l:f[l] for l in labels_}
+        if mmap:
+            data = Table._memmap_npz(fname,labels_)
+        return Table(data,{l:d.shape[1:] for l,d in data.items()},comments)
+
+
+    @staticmethod
+    def _memmap_npz(fname,labels):
+        """Memory-map uncompressed arrays in NumPy .npz file."""
+        data = {}
+        with zipfile.ZipFile(fname) as z, open(fname,'rb') as f:
+            for label in labels:
+                info = z.getinfo(label+'.npy')
+                if info.compress_type != zipfile.ZIP_STORED:
+                    raise ValueError(f'compressed array "{label}" cannot be memory-mapped')
+                f.seek(info.header_offset)
+                N_name,N_extra = struct.unpack('<HH',f.read(30)[26:])                              # local file header
+                f.seek(info.header_offset+30+N_name+N_extra)
+                version = np.lib.format.read_magic(f)
+                shape,fortran,dtype = np.lib.format.read_array_header_1_0(f) if version == (1,0) else \
+                                      np.lib.format.read_array_header_2_0(f)
+                data[label] = np.memmap(fname,dtype,'r',f.tell(),shape,'F' if fortran else 'C')
+        return data
+
+
+    @staticmethod
+    def _load_arrow(fname,labels,mmap):
+        """Load from Apache Parquet or Feather file."""
+        try:
+            import pyarrow.parquet
+            import pyarrow.feather
+        except ImportError:
+            raise ImportError('reading Parquet/Feather files requires pyarrow')
+
+        parquet = Path(fname).suffix.lower() == '.parquet'
+        schema = pyarrow.parquet.read_schema(fname) if parquet else \
+                 pyarrow.ipc.open_file(pyarrow.memory_map(str(fname))).schema
+        meta = json.loads(schema.metadata[b'damask'])
+        shapes = {l:tuple(meta['shapes'][l]) for l in (meta['shapes'] if labels is None else labels)}
+        columns = Table._header_labels(shapes)
+        table = (pyarrow.parquet if parquet else pyarrow.feather).read_table(fname,columns=columns,memory_map=mmap)
+        return Table._from_arrow(table,shapes,meta['comments'])
+
+
+    @staticmethod
+    def _from_arrow(table,shapes,comments):
+        """Create from Apache Arrow table or record batch, single-component columns without copying."""
+        def to_numpy(column):
+            if getattr(column,'num_chunks',1) != 1:
+                return column.to_numpy()
+            return (column.chunk(0) if hasattr(column,'chunk') else column).to_numpy(zero_copy_only=False)
+
+        data = {}
+        for label,shape in shapes.items():
+            columns = [to_numpy(table.column(c)) for c in Table._header_labels({label:shape})]
+            data[label] = columns[0] if shape == (1,) else np.stack(columns,axis=-1)
         return Table(data,shapes,comments)
 
+
+    @staticmethod
+    def _iter_load_arrow(fname,chunksize,labels):
+        """Yield Tables with at most chunksize rows from Apache Parquet or Feather file."""
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError('reading Parquet/Feather files requires pyarrow')
+
+        parquet = Path(fname).suffix.lower() == '.parquet'
+        f = pyarrow.parquet.ParquetFile(fname) if parquet else \
+            pyarrow.ipc.open_file(pyarrow.memory_map(str(fname)))
+        meta = json.loads((f.schema_arrow if parquet else f.schema).metadata[b'damask'])
+        shapes = {l:tuple(meta['shapes'][l]) for l in (meta['shapes'] if labels is None else labels)}
+        batches = f.iter_batches(batch_size=chunksize,columns=Table._header_labels(shapes)) if parquet else \
+                  (b.slice(i,chunksize) for b in map(f.get_batch,range(f.num_record_batches))
+                                        for i in range(0,b.num_rows,chunksize))
+        for batch in batches:
+            yield Table._from_arrow(batch,shapes,meta['comments'])
+
+
     @staticmethod
     def load_ang(fname):
         """
@@ -149,6 +368,11 @@ class Table:
         fname : file, str, or pathlib.Path
             Filename or file for reading.
 
+        Returns
+        -------
+        loaded : damask.Table
+            Loaded table.
+
         """
         try:
             f = open(fname)
@@ -156,23 +380,64 @@ class Table:
             f = fname
             f.seek(0)
 
-        content = f.readlines()
+        comments,shapes,N_columns = Table._read_ang_header(f)
+        data = pd.read_csv(f,names=list(range(N_columns)),dtype=np.float64,sep=r'\s+')
+        return Table(data,shapes,comments)
 
-        comments = [util.execution_stamp('Table','from_ang')]
-        for line in content:
-            if line.startswith('#'):
-                comments.append(line.split('#',1)[1].strip())
-            else:
-                break
 
-        data = np.loadtxt(content)
+    @staticmethod
+    def iter_load_ang(fname,chunksize):
+        """
+        Load from ang file in chunks.
+
+        Parameters
+        ----------
+        fname : file, str, or pathlib.Path
+            Filename or file for reading.
+        chunksize : int
+            Maximum number of rows per chunk.
+
+        Yields
+        ------
+        chunk : damask.Table
+            Table with at most chunksize rows.
+
+        """
+        try:
+            f = open(fname)
+        except TypeError:
+            f = fname
+            f.seek(0)
+
+        try:
+            comments,shapes,N_columns = Table._read_ang_header(f)
+            with pd.read_csv(f,names=list(range(N_columns)),dtype=np.float64,sep=r'\s+',
+                             chunksize=chunksize) as reader:
+                for data in reader:
+                    yield Table(data,shapes,comments)
+        finally:
+            if f is not fname: f.close()
+
+
+    @staticmethod
+    def _read_ang_header(f):
+        """Read comments from header of ang file and determine column shapes from first data row."""
+        comments = [util.execution_stamp('Table','from_ang')]
+        position = f.tell()
+        line = f.readline()
+        while line.startswith('#'):
+            comments.append(line.split('#',1)[1].strip())
+            position = f.tell()
+            line = f.readline()
+        N_columns = len(line.split())
+        f.seek(position)
 
         shapes = {'eu':3, 'pos':2, 'IQ':1, 'CI':1, 'ID':1, 'intensity':1, 'fit':1}
-        remainder = data.shape[1]-sum(shapes.values())
+        remainder = N_columns-sum(shapes.values())
         if remainder > 0:                                                       # 3.8 can do: if (remainder := data.shape[1]-sum(shapes.values())) > 0
             shapes['unknown'] = remainder
 
-        return Table(data,shapes,comments)
+        return comments,shapes,N_columns
 
 
     @property
@@ -189,14 +454,26 @@ class Table:
         label : str
             Column label.
 
+        Returns
+        -------
+        data : numpy.ndarray
+            Read-only view of the data.
+
         """
+        data = self._get(label).view()
+        data.flags.writeable = False
+        return data
+
+
+    def _get(self,label):
+        """Get column data, without copying unless of object type."""
         if re.match(r'[0-9]*?_',label):
             idx,key = label.split('_',1)
-            data = self.data[key].to_numpy()[:,int(idx)-1].reshape(-1,1)
+            data = self._data[key].reshape(len(self),-1)[:,int(idx)-1:int(idx)]
         else:
-            data = self.data[label].to_numpy().reshape((-1,)+self.shapes[label])
+            data = self._data[label]
 
-        return data.astype(type(data.flatten()[0]))
+        return data.astype(type(data.flatten()[0])) if data.dtype == object else data
 
 
     def set(self,label,data,info=None):
@@ -213,15 +490,16 @@ class Table:
             Human-readable information about the new data.
 
         """
-        dup = self.copy()
+        dup = self._dup()
         dup._add_comment(label,data.shape[1:],info)
 
         if re.match(r'[0-9]*?_',label):
             idx,key = label.split('_',1)
-            iloc = dup.data.columns.get_loc(key).tolist().index(True) + int(idx) -1
-            dup.data.iloc[:,iloc] = data
+            new = dup._data[key].reshape(len(dup),-1).copy()
+            new[:,int(idx)-1] = data.reshape(len(dup))
+            dup._data[key] = new.reshape(dup._data[key].shape)
         else:
-            dup.data[label]       = data.reshape(dup.data[label].shape)
+            dup._data[label] = np.array(data).reshape(dup._data[label].shape)
         return dup
 
 
@@ -239,16 +517,11 @@ class Table:
             Human-readable information about the modified data.
 
         """
-        dup = self.copy()
+        dup = self._dup()
         dup._add_comment(label,data.shape[1:],info)
 
         dup.shapes[label] = data.shape[1:] if len(data.shape) > 1 else (1,)
-        size = np.prod(data.shape[1:],dtype=int)
-        new = pd.DataFrame(data=data.reshape(-1,size),
-                           columns=[label]*size,
-                          )
-        new.index = dup.data.index
-        dup.data = pd.concat([dup.data,new],axis=1)
+        dup._data[label] = np.array(data).reshape((-1,)+dup.shapes[label])
         return dup
 
 
@@ -262,8 +535,8 @@ class Table:
             Column label.
 
         """
-        dup = self.copy()
-        dup.data.drop(columns=label,inplace=True)
+        dup = self._dup()
+        del dup._data[label]
         del dup.shapes[label]
         return dup
 
@@ -280,12 +553,12 @@ class Table:
             New column label(s).
 
         """
-        dup = self.copy()
+        dup = self._dup()
         columns = dict(zip([old] if isinstance(old,str) else old,
                            [new] if isinstance(new,str) else new))
-        dup.data.rename(columns=columns,inplace=True)
         dup.comments.append(f'{old} => {new}'+('' if info is None else f': {info}'))
         dup.shapes = {(label if label not in columns else columns[label]):dup.shapes[label] for label in dup.shapes}
+        dup._data  = {(label if label not in columns else columns[label]):dup._data[label]  for label in dup._data}
         return dup
 
 
@@ -301,10 +574,10 @@ class Table:
             Set sort order.
 
         """
-        dup = self.copy()
-        dup._label_discrete()
-        dup.data.sort_values(labels,axis=0,inplace=True,ascending=ascending)
-        dup._label_uniform()
+        labels_ = [labels] if isinstance(labels,str) else labels
+        keys = pd.DataFrame({i:self._get(l).reshape(len(self)) for i,l in enumerate(labels_)})
+        order = keys.sort_values(list(range(len(labels_))),ascending=ascending).index.to_numpy()
+        dup = self[order]
         dup.comments.append(f'sorted {"ascending" if ascending else "descending"} by {labels}')
         return dup
 
@@ -321,11 +594,11 @@ class Table:
             Table to append.
 
         """
-        if self.shapes != other.shapes or not self.data.columns.equals(other.data.columns):
+        if list(self.shapes.items()) != list(other.shapes.items()):
             raise KeyError('Labels or shapes or order do not match')
         else:
-            dup = self.copy()
-            dup.data = dup.data.append(other.data,ignore_index=True)
+            dup = self._dup()
+            dup._data = {label:np.concatenate([d,other._data[label]]) for label,d in self._data.items()}
             return dup
 
 
@@ -341,20 +614,42 @@ class Table:
             Table to join.
 
         """
-        if set(self.shapes) & set(other.shapes) or self.data.shape[0] != other.data.shape[0]:
+        if set(self.shapes) & set(other.shapes) or len(self) != len(other):
             raise KeyError('Dublicated keys or row count mismatch')
         else:
-            dup = self.copy()
-            dup.data = dup.data.join(other.data)
+            dup = self._dup()
             for key in other.shapes:
                 dup.shapes[key] = other.shapes[key]
+                dup._data[key]  = other._data[key]
             return dup
 
 
+    @staticmethod
+    def _header_labels(shapes):
+        """Column labels of ASCII table, e.g. v ==> 1_v 2_v 3_v."""
+        labels = []
+        for l,shape in shapes.items():
+            if shape == (1,):
+                labels.append(f'{l}')
+            elif len(shape) == 1:
+                labels += [f'{i+1}_{l}' \
+                          for i in range(shape[0])]
+            else:
+                labels += [f'{util.srepr(shape,"x")}:{i+1}_{l}' \
+                          for i in range(np.prod(shape))]
+        return labels
+
+
     def save(self,fname,legacy=False):
         """
         Save as plain text file.
 
+        Files with extension '.npz' (NumPy), '.parquet', or '.feather' (Apache Arrow,
+        requires pyarrow) are written in binary format. Binary files preserve
+        shapes and comments and can be read partially and memory-mapped by
+        Table.load, except Parquet files that cannot be memory-mapped and
+        multi-component columns of Feather files that are stored per component.
+
         Parameters
         ----------
         fname : file, str, or pathlib.Path
@@ -364,17 +659,15 @@ class Table:
             in contrast to using comment sign ('#') at beginning of lines.
 
         """
-        seen = set()
-        labels = []
-        for l in [x for x in self.data.columns if not (x in seen or seen.add(x))]:
-            if self.shapes[l] == (1,):
-                labels.append(f'{l}')
-            elif len(self.shapes[l]) == 1:
-                labels += [f'{i+1}_{l}' \
-                          for i in range(self.shapes[l][0])]
-            else:
-                labels += [f'{util.srepr(self.shapes[l],"x")}:{i+1}_{l}' \
-                          for i in range(np.prod(self.shapes[l]))]
+        suffix = Path(fname).suffix.lower() if isinstance(fname,(str,Path)) else None
+        if suffix == '.npz':
+            np.savez(fname,**{l:self._get(l) for l in self.shapes},**{'#comments':np.array(self.comments,dtype=str)})
+            return
+        elif suffix in ['.parquet','.feather']:
+            self._save_arrow(fname)
+            return
+
+        labels = Table._header_labels(self.shapes)
 
         header = ([f'{len(self.comments)+1} header'] + self.comments) if legacy else \
                   [f'# {comment}' for comment in self.comments]
@@ -385,4 +678,244 @@ class Table:
             fhandle = fname
 
         for line in header + [' '.join(labels)]: fhandle.write(line+'\n')
-        self.data.to_csv(fhandle,sep=' ',na_rep='nan',index=False,header=False)
+        self._write_rows(fhandle)
+
+
+    def _save_arrow(self,fname):
+        """Save as Apache Parquet or Feather (uncompressed, for memory mapping) file."""
+        try:
+            import pyarrow.parquet
+            import pyarrow.feather
+        except ImportError:
+            raise ImportError('writing Parquet/Feather files requires pyarrow')
+
+        table = self._to_arrow()
+        if Path(fname).suffix.lower() == '.parquet':
+            pyarrow.parquet.write_table(table,fname)
+        else:
+            pyarrow.feather.write_feather(table,fname,compression='uncompressed')
+
+
+    def _to_arrow(self):
+        """Convert to Apache Arrow table with shapes and comments as metadata."""
+        import pyarrow
+        meta = {'shapes':{l:list(s) for l,s in self.shapes.items()},'comments':self.comments}
+        columns = [c for l in self.shapes for c in self._get(l).reshape(len(self),-1).T]
+        return pyarrow.table(dict(zip(Table._header_labels(self.shapes),columns)),
+                             metadata={'damask':json.dumps(meta)})
+
+
+    @staticmethod
+    def concatenate_files(fnames,fname,chunksize=2**20):
+        """
+        Append tables stored in files vertically and save result.
+
+        Tables are processed in chunks, i.e. the memory consumption is bounded.
+
+        Parameters
+        ----------
+        fnames : iterable of str or pathlib.Path
+            Filenames of tables to concatenate.
+            Requires matching labels/shapes and order.
+        fname : str or pathlib.Path
+            Filename for writing. The format is selected as for Table.save.
+        chunksize : int, optional
+            Number of rows to read at once. Defaults to 2^20.
+
+        """
+        with _TableWriter(fname) as writer:
+            for f in fnames:
+                for chunk in Table.iter_load(f,chunksize):
+                    writer.write(chunk)
+
+
+    @staticmethod
+    def sort_files(fnames,fname,labels,ascending=True,chunksize=2**20):
+        """
+        Sort tables stored in files by values of given labels and save result.
+
+        The tables are sorted in chunks that are merged afterwards (external merge sort),
+        i.e. the memory consumption is bounded. Temporary files are placed next to fname.
+
+        Parameters
+        ----------
+        fnames : str, pathlib.Path, or iterable of str or pathlib.Path
+            Filename(s) of table(s) to sort.
+            Requires matching labels/shapes and order.
+        fname : str or pathlib.Path
+            Filename for writing. The format is selected as for Table.save.
+        labels : str or list
+            Column labels for sorting.
+        ascending : bool or list, optional
+            Set sort order.
+        chunksize : int, optional
+            Number of rows to sort at once. Defaults to 2^20.
+
+        """
+        fnames_ = [fnames] if isinstance(fnames,(str,Path)) else fnames
+        labels_ = [labels] if isinstance(labels,str) else labels
+        ascending_ = [ascending]*len(labels_) if isinstance(ascending,bool) else ascending
+
+        def descending(k):
+            """Key with reversed order, integers are inverted bitwise to avoid overflow."""
+            if k.dtype.kind == 'f':
+                return -k
+            if k.dtype.kind in 'iub':
+                return ~k
+            raise TypeError(f'descending order requires numeric keys, not "{k.dtype}"')
+
+        def keys(table,start,end):
+            """Keys for numpy.lexsort, i.e. primary key last."""
+            return [(k if a else descending(k)) for k,a in
+                    reversed([(table._get(l)[start:end].reshape(-1),a) for l,a in zip(labels_,ascending_)])]
+
+        with tempfile.TemporaryDirectory(dir=Path(fname).absolute().parent) as tmp:
+            runs = []
+            for f in fnames_:
+                for chunk in Table.iter_load(f,chunksize):
+                    runs.append(Path(tmp)/f'{len(runs)}.npz')
+                    chunk.sort_by(labels,ascending).save(runs[-1])
+            runs = [Table.load(r,mmap=True) for r in runs]
+            N = [len(r) for r in runs]
+            position = [0]*len(runs)
+            block = max(1,chunksize//max(1,len(runs)))
+
+            with _TableWriter(fname) as writer:
+                while any(p < n for p,n in zip(position,N)):
+                    end = [min(p+block,n) for p,n in zip(position,N)]
+                    K = [np.concatenate(k) for k in zip(*[keys(r,p,e) for r,p,e in zip(runs,position,end)])]
+                    limits = [keys(r,e-1,e) for r,e,n in zip(runs,end,N) if e < n]                  # last buffered row of unfinished runs
+                    if limits:
+                        limits = [np.concatenate(k) for k in zip(*limits)]
+                        smallest = np.lexsort(limits)[0]
+                        order = np.lexsort([np.append(k,l[smallest]) for k,l in zip(K,limits)])
+                        order = order[:np.argmax(order == len(K[0]))]                               # rows up to the smallest limit
+                    else:
+                        order = np.lexsort(K)
+
+                    data = {l:np.concatenate([r._get(l)[p:e] for r,p,e in zip(runs,position,end)])[order]
+                            for l in runs[0].shapes}
+                    writer.write(Table(data,runs[0].shapes,runs[0].comments))
+
+                    offsets = np.cumsum([0]+[e-p for p,e in zip(position,end)])
+                    position = [p+int(np.count_nonzero((order >= o) & (order < o_))) for p,o,o_ in
+                                zip(position,offsets[:-1],offsets[1:])]                             # taken rows are a prefix of each run
+            del runs                                                                                # release memory maps before removing files
+
+
+class _TableWriter:
+    """Save Table in chunks."""
+
+    def __init__(self,fname):
+        """
+        New writer.
+
+        Parameters
+        ----------
+        fname : str or pathlib.Path
+            Filename for writing. The format is selected as for Table.save.
+
+        """
+        self.fname = Path(fname)
+        self.format = self.fname.suffix.lower() if self.fname.suffix.lower() in ['.npz','.parquet','.feather'] else 'ASCII'
+        self.shapes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        if args[0] is None or self.shapes is not None:                                              # do not hide exception
+            self.close()
+
+    def write(self,table):
+        """
+        Write rows of table, requires matching labels/shapes and order.
+
+        Data types are promoted if needed, i.e. rows that have
+        already been written are converted.
+
+        """
+        if self.shapes is None:
+            self.shapes = table.shapes.copy()
+            self.comments = table.comments.copy()
+            self._dtypes = {l:table._get(l).dtype for l in self.shapes}
+            if self.format == 'ASCII':
+                self._f = open(self.fname,'w')
+                table.save(self._f)
+                return
+            elif self.format == '.npz':
+                self._tmp = tempfile.TemporaryDirectory(dir=self.fname.absolute().parent)
+                self._f = {l:open(Path(self._tmp.name)/f'{i}.raw','wb') for i,l in enumerate(self.shapes)}
+                self._N = 0
+            else:
+                self._open_arrow(table)
+        elif list(self.shapes.items()) != list(table.shapes.items()):
+            raise KeyError('Labels or shapes or order do not match')
+        else:
+            dtypes = {l:np.result_type(d,table._get(l).dtype) for l,d in self._dtypes.items()}
+            if dtypes != self._dtypes: self._promote(dtypes,table)
+
+        if self.format == 'ASCII':
+            table._write_rows(self._f)
+        elif self.format == '.npz':
+            for l,f in self._f.items():
+                f.write(np.ascontiguousarray(table._get(l),self._dtypes[l]).tobytes())
+            self._N += len(table)
+        else:
+            self._f.write_table(self._cast(table)._to_arrow())
+
+    def _cast(self,table):
+        """Convert table to current data types."""
+        return Table({l:table._get(l).astype(d,copy=False) for l,d in self._dtypes.items()},
+                     self.shapes,self.comments)
+
+    def _open_arrow(self,table):
+        """Open Parquet or Feather file with schema according to current data types."""
+        import pyarrow.parquet
+        schema = self._cast(table)._to_arrow().schema
+        self._f = pyarrow.parquet.ParquetWriter(self.fname,schema) if self.format == '.parquet' else \
+                  pyarrow.ipc.new_file(str(self.fname),schema)
+
+    def _promote(self,dtypes,table):
+        """Convert rows that have already been written to new data types."""
+        if self.format == '.npz':
+            for l,f in self._f.items():
+                if dtypes[l] == self._dtypes[l]: continue
+                f.close()
+                N_values = int(np.prod(self.shapes[l],dtype=int))
+                with open(f.name,'rb') as old, open(f.name+'.new','wb') as new:
+                    for _ in range(0,self._N,2**20):
+                        np.fromfile(old,self._dtypes[l],2**20*N_values).astype(dtypes[l]).tofile(new)
+                shutil.move(f.name+'.new',f.name)
+                self._f[l] = open(f.name,'ab')
+            self._dtypes = dtypes
+        elif self.format in ['.parquet','.feather']:
+            self._f.close()
+            with tempfile.TemporaryDirectory(dir=self.fname.absolute().parent) as tmp:
+                old = Path(tmp)/self.fname.name
+                shutil.move(self.fname,old)
+                self._dtypes = dtypes
+                self._open_arrow(table)
+                for chunk in Table.iter_load(old,2**20):
+                    self._f.write_table(self._cast(chunk)._to_arrow())
+        else:
+            self._dtypes = dtypes
+
+    def close(self):
+        """Finalize file."""
+        if self.shapes is None:
+            raise ValueError('no data written')
+        if self.format == '.npz':
+            with zipfile.ZipFile(self.fname,'w',zipfile.ZIP_STORED,allowZip64=True) as z:
+                for l,f in self._f.items():
+                    f.close()
+                    with z.open(l+'.npy','w',force_zip64=True) as m, open(f.name,'rb') as raw:
+                        np.lib.format.write_array_header_2_0(m,{'descr':np.lib.format.dtype_to_descr(self._dtypes[l]),
+                                                                'fortran_order':False,
+                                                                'shape':(self._N,)+self.shapes[l]})
+                        shutil.copyfileobj(raw,m)
+                with z.open('#comments.npy','w') as m:
+                    np.lib.format.write_array(m,np.array(self.comments,dtype=str))
+            self._tmp.cleanup()
+        else:
+            self._f.close()
@@ -398,14 +398,13 @@ class Test:
       files = [str(files)]
 
     tables = [damask.Table.load(filename) for filename in files]
-    for table in tables:
-      table._label_discrete()
 
     columns += [columns[0]]*(len(files)-len(columns))                          # extend to same length as files
     columns = columns[:len(files)]                                             # truncate to same length as files
 
     for i,column in enumerate(columns):
-      if column is None: columns[i] = list(tables[i].data.columns)             # if no column is given, read all
+      if column is None: columns[i] = [('' if np.prod(shape) == 1 else f'{j+1}_')+label   # if no column is given, read all
+                                       for label,shape in tables[i].shapes.items() for j in range(np.prod(shape))]
 
     logging.info('comparing ASCIItables statistically')
     for i in range(len(columns)):
@@ -419,7 +418,6 @@ class Test:
 
     data = []
     for table,labels in zip(tables,columns):
-      table._label_uniform()
       data.append(np.hstack(list(table.get(label) for label in labels)))
 
 
@@ -181,7 +181,7 @@ class VTK:
     def _write(writer):
         """Wrapper for parallel writing."""
         writer.Write()
-    def save(self,fname,parallel=True,compress=True):
+    def save(self,fname,parallel=True,compress=True,appended=False):
         """
         Save as VTK file.
 
@@ -191,8 +191,11 @@ class VTK:
             Filename for writing.
         parallel : boolean, optional
             Write data in parallel background process. Defaults to True.
-        compress : bool, optional
-            Compress with zlib algorithm. Defaults to True.
+        compress : bool or {'zlib','lz4','lzma'}, optional
+            Compress with given algorithm, True selects zlib. Defaults to True.
+        appended : bool, optional
+            Store data as raw binary in appended section instead of base64-encoded
+            inline. Faster to write and read, but not valid XML. Defaults to False.
 
         """
         if   isinstance(self.vtk_data,vtk.vtkRectilinearGrid):
@@ -206,11 +209,21 @@ class VTK:
         ext = Path(fname).suffix
         writer.SetFileName(str(fname)+(default_ext if default_ext != ext else ''))
 
-        if compress:
+        if compress in [True,'zlib']:
             writer.SetCompressorTypeToZLib()
-        else:
+        elif compress == 'lz4':
+            writer.SetCompressorTypeToLZ4()
+        elif compress == 'lzma':
+            writer.SetCompressorTypeToLZMA()
+        elif compress is False:
             writer.SetCompressorTypeToNone()
-        writer.SetDataModeToBinary()
+        else:
+            raise ValueError(f'invalid compression "{compress}"')
+        if appended:
+            writer.SetDataModeToAppended()
+            writer.EncodeAppendedDataOff()
+        else:
+            writer.SetDataModeToBinary()
         writer.SetInputData(self.vtk_data)
 
         if parallel:
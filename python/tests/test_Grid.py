@@ -1,5 +1,6 @@
 import pytest
 import numpy as np
+from scipy import spatial
 from vtk.util.numpy_support import numpy_to_vtk as np_to_vtk
 
 from damask import VTK
@@ -176,6 +177,13 @@ class TestGrid:
                          )
 
 
+    @pytest.mark.parametrize('material',[np.random.randint(0,7,(5,5,5)),np.random.randint(0,7,(5,5,5))+.5])
+    def test_clean_global(self,material):
+        unique,counts = np.unique(material,return_counts=True)
+        cleaned = Grid(material,np.ones(3)).clean(5,periodic=True)
+        assert np.all(cleaned.material == unique[np.argmax(counts)]) and cleaned.material.dtype == material.dtype
+
+
     @pytest.mark.parametrize('cells',[
                                      (10,11,10),
                                      [10,13,10],
@@ -344,6 +352,38 @@ class TestGrid:
         assert np.all(Laguerre.material == ms)
 
 
+    @pytest.mark.parametrize('periodic',[True,False])
+    def test_Laguerre_brute_force(self,periodic):
+        cells  = np.random.randint(5,10,3)
+        size   = np.random.random(3) + 1.0
+        N_seeds= np.random.randint(10,30)
+        seeds  = np.random.rand(N_seeds,3) * np.broadcast_to(size,(N_seeds,3))
+        weights= np.random.random(N_seeds)*.1
+        Laguerre = Grid.from_Laguerre_tessellation(cells,size,seeds,weights,periodic=periodic)
+        coords = grid_filters.coordinates0_point(cells,size).reshape(-1,1,3)
+        d = coords-seeds
+        if periodic: d -= np.round(d/size)*size
+        assert np.all(Laguerre.material.flatten() == np.argmin(np.sum(d**2,axis=-1)-weights,axis=-1))
+
+    @pytest.mark.parametrize('periodic',[True,False])
+    def test_Voronoi_slabs(self,periodic):
+        cells  = np.random.randint(60,80,3)
+        size   = np.random.random(3) + 1.0
+        N_seeds= np.random.randint(10,30)
+        seeds  = np.random.rand(N_seeds,3) * np.broadcast_to(size,(N_seeds,3))
+        Voronoi = Grid.from_Voronoi_tessellation(cells,size,seeds,periodic=periodic)
+        KDTree = spatial.cKDTree(seeds,boxsize=size) if periodic else spatial.cKDTree(seeds)
+        assert np.all(Voronoi.material == KDTree.query(grid_filters.coordinates0_point(cells,size))[1])
+
+    def test_Voronoi_many_seeds(self):
+        cells  = np.random.randint(10,20,3)
+        size   = np.random.random(3) + 1.0
+        seeds  = np.random.rand(127,3) * np.broadcast_to(size,(127,3))
+        Voronoi = Grid.from_Voronoi_tessellation(cells,size,seeds)
+        assert Voronoi.material.dtype == int
+        assert np.all(Voronoi.vicinity_offset().material >= Voronoi.material)
+        assert np.all(Voronoi.renumber().material < 127)
+
     @pytest.mark.parametrize('approach',['Laguerre','Voronoi'])
     def test_tessellate_bicrystal(self,approach):
         cells = np.random.randint(5,10,3)*2
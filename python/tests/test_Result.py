@@ -1,4 +1,7 @@
 import time
+import threading
+import multiprocessing as mp
+import xml.etree.ElementTree as ET
 import shutil
 import os
 import sys
@@ -7,14 +10,22 @@ from datetime import datetime
 import pytest
 import numpy as np
 import h5py
+import vtk
+from vtk.util.numpy_support import vtk_to_numpy as vtk_to_np
 
 from damask import Result
+from damask import VTK
 from damask import Rotation
 from damask import Orientation
 from damask import tensor
 from damask import mechanics
 from damask import grid_filters
 
+def join_writers():
+    """Wait for VTK files written in background processes (pool workers are daemonic)."""
+    for p in mp.active_children():
+        if not p.daemon: p.join()
+
 @pytest.fixture
 def default(tmp_path,ref_path):
     """Small Result file in temp location for modification."""
@@ -90,6 +101,34 @@ class TestResult:
 
         assert a == b == []
 
+    def test_context_manager(self,default):
+        with default as r:
+            r.add_stress_Cauchy()
+            with h5py.File(r.fname,'r') as f:
+                assert all(l in f for l in r.get_dataset_location('sigma'))
+            in_context = r.read_dataset(r.get_dataset_location('sigma'))
+        assert np.allclose(in_context,default.read_dataset(default.get_dataset_location('sigma')))
+
+    def test_index(self,default):
+        default.view('increments',True)
+        with h5py.File(default.fname,'r') as f:
+            for group,datasets in default._index.items():
+                assert list(f[group].keys()) == list(datasets)
+
+    def test_mapping(self,default):
+        with h5py.File(default.fname,'r') as f:
+            for (ty,name,*c),(points,positions) in default._get_mapping().items():
+                table = f[f'mapping/{ty}'][:,c[0]] if ty == 'phase' else f[f'mapping/{ty}'][()]
+                assert np.all(points == np.where(table['Name'] == str.encode(name))[0])
+                assert np.all(positions == table['Position'][points])
+
+    def test_mapping_modified(self,default):
+        mapping = default._get_mapping()
+        default.add_absolute('F')
+        assert default._get_mapping() is mapping
+        os.utime(default.fname,ns=(0,0))
+        assert default._get_mapping() is not mapping
+
     def test_view_invalid(self,default):
         with pytest.raises(AttributeError):
             default.view('invalid',True)
@@ -121,6 +160,65 @@ class TestResult:
         in_file   = default.read_dataset(loc['x'],0)
         assert np.allclose(in_memory,in_file)
 
+    @pytest.mark.parametrize('formula,expected',[('#F#*#P#+2*#F#',  lambda F,P: F*P+2*F),
+                                                 ('np.sqrt(np.abs(#P#))/#F#',lambda F,P: np.sqrt(np.abs(P))/F),
+                                                 ('np.where(#F#>0.5,#P#,-#P#)',lambda F,P: np.where(F>0.5,P,-P)),
+                                                 ('np.linalg.det(#F#)',lambda F,P: np.linalg.det(F))])
+    def test_add_calculation_formula(self,default,formula,expected):
+        default.add_calculation('x',formula)
+        loc = {'F':    default.get_dataset_location('F'),
+               'P':    default.get_dataset_location('P'),
+               'x':    default.get_dataset_location('x')}
+        in_memory = expected(default.read_dataset(loc['F'],0),default.read_dataset(loc['P'],0))
+        in_file   = default.read_dataset(loc['x'],0)
+        assert np.allclose(in_memory.reshape(in_file.shape),in_file)
+
+    @pytest.mark.parametrize('numexpr',[True,False])
+    @pytest.mark.parametrize('dtype',['np.uint8','np.uint64','np.float16','np.int32','np.float64'])
+    def test_add_calculation_numexpr(self,default,monkeypatch,numexpr,dtype):
+        if numexpr:
+            pytest.importorskip('numexpr')
+        else:
+            monkeypatch.setitem(sys.modules,'numexpr',None)
+        default.add_calculation('u',f'(np.abs(#F#)*100).astype({dtype})')
+        default.add_calculation('x','np.where(#u#>1,np.sqrt(#u#)*2+#F#,-#F#)')
+        loc = {'F':    default.get_dataset_location('F'),
+               'u':    default.get_dataset_location('u'),
+               'x':    default.get_dataset_location('x')}
+        F = default.read_dataset(loc['F'],0)
+        u = default.read_dataset(loc['u'],0)
+        assert u.dtype == eval(dtype)
+        assert np.allclose(np.where(u>1,np.sqrt(u)*2+F,-F),default.read_dataset(loc['x'],0),rtol=1e-3)
+
+    @pytest.mark.parametrize('numexpr',[True,False])
+    def test_add_calculation_comparison(self,default,monkeypatch,numexpr):
+        if numexpr:
+            pytest.importorskip('numexpr')
+        else:
+            monkeypatch.setitem(sys.modules,'numexpr',None)
+        default.add_calculation('x','#F#*2>2.5')
+        x = default.read_dataset(default.get_dataset_location('x'),0)
+        assert x.dtype == bool
+        assert np.array_equal(default.read_dataset(default.get_dataset_location('F'),0)*2>2.5,x)
+
+    def test_add_calculation_invalid(self,default):
+        with pytest.raises(ValueError):
+            default.add_calculation('x','#F#*#O#')
+
+    @pytest.mark.parametrize('storage',[{},{'compression':None,'checksum':False},
+                                        {'compression':'lzf','layout':'component'},{'compression':'gzip','level':1}])
+    def test_set_storage(self,default,storage):
+        default.set_storage(**storage)
+        default.add_calculation('x','2*#F#')
+        loc = {'F':    default.get_dataset_location('F'),
+               'x':    default.get_dataset_location('x')}
+        assert np.allclose(2*default.read_dataset(loc['F'],0),default.read_dataset(loc['x'],0))
+
+    @pytest.mark.parametrize('storage',[{'compression':'zip'},{'layout':'random'}])
+    def test_set_storage_invalid(self,default,storage):
+        with pytest.raises(ValueError):
+            default.set_storage(**storage)
+
     def test_add_stress_Cauchy(self,default):
         default.add_stress_Cauchy('P','F')
         loc = {'F':    default.get_dataset_location('F'),
@@ -301,6 +399,126 @@ class TestResult:
         in_file   = default.read_dataset(loc['V(F)'],0)
         assert np.allclose(in_memory,in_file)
 
+    @pytest.mark.parametrize('slab_length',[1,10,1000])
+    def test_add_slabs(self,default,slab_length):
+        default._slab_length = slab_length
+        default.add_stress_Cauchy('P','F')
+        default.add_norm('F',1)
+        loc = {'F':    default.get_dataset_location('F'),
+               'P':    default.get_dataset_location('P'),
+               'sigma':default.get_dataset_location('sigma'),
+               '|F|_1':default.get_dataset_location('|F|_1')}
+        F = default.read_dataset(loc['F'],0)
+        assert np.allclose(mechanics.stress_Cauchy(default.read_dataset(loc['P'],0),F),
+                           default.read_dataset(loc['sigma'],0))
+        assert np.allclose(np.linalg.norm(F,ord=1,axis=(1,2),keepdims=True),
+                           default.read_dataset(loc['|F|_1'],0))
+
+    @pytest.mark.parametrize('formula,expected',[('2*#F#+1',         lambda F: 2*F+1),
+                                                 ('#F#-np.mean(#F#)',lambda F: F-np.mean(F)),
+                                                 ('#F#/np.max(#F#)', lambda F: F/np.max(F))])
+    def test_add_calculation_slabs(self,default,formula,expected):
+        default._slab_length = 10
+        default.add_calculation('x',formula)
+        with h5py.File(default.fname,'r') as f:
+            for path in default.get_dataset_location('x'):
+                F = f[path.replace('/x','/F')][()]
+                assert F.shape[0] > default._slab_length
+                assert np.allclose(expected(F),f[path][()])
+
+    @pytest.mark.parametrize('slab_length',[10,1000])
+    def test_batch(self,default,slab_length):
+        default._slab_length = slab_length
+        with default.batch():
+            default.add_equivalent_Mises('sigma')
+            default.add_stress_Cauchy('P','F')
+            default.add_strain('F','V',0.0)
+            assert default.get_dataset_location('sigma') == []
+        loc = {'F':        default.get_dataset_location('F'),
+               'P':        default.get_dataset_location('P'),
+               'sigma':    default.get_dataset_location('sigma'),
+               'sigma_vM': default.get_dataset_location('sigma_vM'),
+               'epsilon':  default.get_dataset_location('epsilon_V^0.0(F)')}
+        sigma = mechanics.stress_Cauchy(default.read_dataset(loc['P'],0),default.read_dataset(loc['F'],0))
+        assert np.allclose(sigma,default.read_dataset(loc['sigma'],0))
+        assert np.allclose(mechanics.equivalent_stress_Mises(sigma).reshape(-1,1),
+                           default.read_dataset(loc['sigma_vM'],0))
+        assert np.allclose(mechanics.strain(default.read_dataset(loc['F'],0),'V',0.0),
+                           default.read_dataset(loc['epsilon'],0))
+
+    def test_add_pool(self,default):
+        default.add_absolute('F')
+        pool = default._pool
+        default.add_absolute('P')
+        assert pool is default._pool
+        default.close()
+        assert default._pool is None
+
+    def test_add_pool_user_function(self,default):
+        default.add_absolute('F')
+        pool = default._pool
+        default.enable_user_function(np.abs)
+        assert default._pool is None and all(not p.is_alive() for p in pool._pool)
+
+    @pytest.mark.parametrize('exception,expected',[(ValueError,ValueError),(SystemExit,RuntimeError)])
+    def test_add_writer_error(self,default,monkeypatch,exception,expected):
+        def create_dataset(*args,**kwargs):
+            raise exception
+        default._slab_length = 1
+        monkeypatch.setattr(default,'_create_dataset',create_dataset)
+        with pytest.raises(expected):
+            default.add_absolute('F')
+
+    def test_job_missing_input(self,tmp_path):
+        r = Result._job([(Result._add_absolute,{'x':'F'},{},True)],
+                        {'F':{'data':str(tmp_path/'missing.npy'),'label':'F','meta':{}}},str(tmp_path/'out'))
+        assert r == [None]
+
+    @pytest.mark.parametrize('operator,label',[('curl','F_p'),('curl','u_p'),('divergence','P'),('gradient','u_p')])
+    def test_add_grid_operator(self,default,operator,label):
+        getattr(default,f'add_{operator}')(label)
+        cells = tuple(default.cells)
+        loc = default.get_dataset_location(f'{operator}({label})')
+        if label == 'u_p':
+            field = default.read_dataset(default.get_dataset_location(label))
+            field = field.reshape(field.shape[0],-1).reshape(cells+(-1,),order='F').reshape(cells+field.shape[1:])
+            in_file = default.read_dataset(loc)
+            in_file = in_file.reshape(in_file.shape[0],-1).reshape(cells+(-1,),order='F').reshape(cells+in_file.shape[1:])
+        else:
+            field = default.lazy_dataset(default.get_dataset_location(label)).grid[:,:,:]
+            in_file = default.lazy_dataset(loc).grid[:,:,:]
+        in_memory = getattr(grid_filters,operator)(default.size,field)
+        assert np.allclose(in_memory,in_file)
+
+    @pytest.mark.parametrize('mode',['point','node'])
+    def test_add_displacement(self,default,mode):
+        default.add_displacement('F',mode)
+        F = default.lazy_dataset(default.get_dataset_location('F')).grid[:,:,:]
+        loc = default.get_dataset_location(f'u_{mode[0]}(F)')
+        if mode == 'point':
+            in_file = default.lazy_dataset(loc).grid[:,:,:]
+        else:
+            in_file = default.read_dataset(loc).reshape(tuple(default.cells+1)+(3,),order='F')
+        assert np.allclose(getattr(grid_filters,f'displacement_{mode}')(default.size,F),in_file)
+
+    def test_add_grid_operator_invalid(self,default):
+        default.structured = False
+        with pytest.raises(TypeError):
+            default.add_curl('F')
+
+    def test_add_gradient_scalar(self,default):
+        default.add_determinant('F')
+        default.add_gradient('det(F)')
+        field = default.lazy_dataset(default.get_dataset_location('det(F)')).grid[:,:,:]
+        in_file = default.lazy_dataset(default.get_dataset_location('gradient(det(F))')).grid[:,:,:]
+        assert np.allclose(grid_filters.gradient(default.size,field.reshape(field.shape[:3]+(1,))),
+                           in_file.reshape(field.shape[:3]+(3,)))
+
+    def test_add_grid_operator_constituents(self,default):
+        default.N_constituents = 2
+        with pytest.raises(ValueError):
+            default.add_curl('F')
+
     def test_add_invalid(self,default):
         with pytest.raises(TypeError):
             default.add_calculation('#invalid#*2')
@@ -353,6 +571,161 @@ class TestResult:
         with pytest.raises(PermissionError):
             default.rename('P','another_new_name')
 
+    def test_index_external_modification(self,default):
+        other = Result(default.fname)
+        other.view('times',20.0)
+        other.add_calculation('x','2*#F#')
+        assert default.get_dataset_location('x') == other.get_dataset_location('x') != []
+        with h5py.File(default.fname,'a') as f:
+            for p in default.get_dataset_location('x'): del f[p]
+        assert default.get_dataset_location('x') == []
+
+    @pytest.mark.parametrize('label,plain',[('F',False),('xi_sl',False),('O',True),('u_p',False)])
+    @pytest.mark.parametrize('item',[slice(None),slice(3,None,7),5,-1,[100,3,3,17],
+                                     np.arange(336)%3==1,(slice(None,40),0)])
+    def test_lazy_dataset(self,default,label,plain,item):
+        loc = default.get_dataset_location(label)
+        assert np.array_equal(default.read_dataset(loc,0,plain)[item],
+                              default.lazy_dataset(loc,0,plain)[item],equal_nan=True)
+
+    def test_lazy_dataset_points(self,default):
+        default.view('phases','pheno_fcc')
+        F = default.lazy_dataset(default.get_dataset_location('F'))
+        assert not np.any(np.isnan(F[F.points]))
+        assert np.all(np.isnan(np.delete(F[:],F.points,axis=0)))
+
+    @pytest.mark.parametrize('item',[(slice(None),)*3,(slice(1,3),0,slice(None,None,-1)),(2,3,4),
+                                     (slice(None),slice(None),slice(None),0)])
+    def test_lazy_dataset_grid(self,default,item):
+        loc = default.get_dataset_location('F')
+        F = default.read_dataset(loc).reshape(tuple(default.cells)+(3,3),order='F')
+        assert np.allclose(F[item],default.lazy_dataset(loc).grid[item])
+
+    def test_follow(self,tmp_path,ref_path):
+        fname = tmp_path/'follow.hdf5'
+        shutil.copy(ref_path/'12grains6x7x8_tensionY.hdf5',fname)
+        with h5py.File(fname,'a') as f:
+            increments = sorted([i for i in f if i.startswith('inc')],key=lambda i:int(i[3:]))
+            for inc in increments[2:]: del f[inc]
+        r = Result(fname)
+        r.allow_modification()
+        followed = []
+        for incs in r.follow(interval=0.01,timeout=0.5):
+            assert r.visible['increments'] == incs
+            r.add_stress_Cauchy()
+            followed += incs
+            if len(followed) == 2:
+                with h5py.File(fname,'a') as f, h5py.File(ref_path/'12grains6x7x8_tensionY.hdf5','r') as ref:
+                    for inc in increments[2:]: ref.copy(inc,f)
+        assert followed == increments == r.increments == r.visible['increments']
+        assert len(r.get_dataset_location('sigma')) == len(r.get_dataset_location('P'))
+
+    def test_follow_persistent(self,tmp_path,ref_path):
+        fname = tmp_path/'follow.hdf5'
+        shutil.copy(ref_path/'12grains6x7x8_tensionY.hdf5',fname)
+        with h5py.File(fname,'a') as f:
+            increments = sorted([i for i in f if i.startswith('inc')],key=lambda i:int(i[3:]))
+            for inc in increments[2:]: del f[inc]
+
+        def write():
+            for _ in range(1000):
+                try:
+                    with h5py.File(fname,'a') as f, h5py.File(ref_path/'12grains6x7x8_tensionY.hdf5','r') as ref:
+                        for inc in increments[2:]: ref.copy(inc,f)
+                    return
+                except OSError:                                                                     # file is locked by reader
+                    time.sleep(0.01)
+
+        followed = []
+        writer = threading.Thread(target=write)
+        with Result(fname) as r:
+            for incs in r.follow(interval=0.05,timeout=1.0):
+                assert r._handle is not None
+                assert len(r.get_dataset_location('F')) == 2*len(incs)
+                followed += incs
+                if not writer.is_alive() and len(followed) == 2: writer.start()
+            assert r._handle is not None
+        writer.join()
+        assert followed == increments == r.increments
+
+    @pytest.mark.parametrize('parallel',[True,False])
+    @pytest.mark.parametrize('label,points',[('F',[0,17,335]),('xi_sl',np.arange(0,336,5)),('u_p',3)])
+    def test_time_series(self,default,label,points,parallel):
+        default.view('increments',True)
+        increments = default.visible['increments']
+        ts = default.time_series(label,points,parallel=parallel)
+        assert ts.shape[:2] == (len(increments),np.size(points))
+        for inc,data in zip(increments,ts):
+            default.view('increments',inc)
+            loc = default.get_dataset_location(label)
+            assert np.allclose(data,default.read_dataset(loc)[np.atleast_1d(points)],equal_nan=True)
+
+    @pytest.mark.parametrize('parallel',[True,False])
+    @pytest.mark.parametrize('per_phase',[True,False])
+    def test_reduce(self,default,parallel,per_phase):
+        default.view('increments',True)
+        increments = default.visible['increments']
+        t = default.reduce('P',['mean','min','max','percentile','histogram'],q=[10,90],bins=7,
+                           per_phase=per_phase,parallel=parallel)
+        assert np.allclose(t.get('time'),default.times)
+        phases = default.visible['phases'] if per_phase else [None]
+        for i,inc in enumerate(increments):
+            default.view('increments',inc)
+            for ph in phases:
+                prefix = '' if ph is None else f'{ph}/'
+                with h5py.File(default.fname,'r') as f:
+                    P = np.concatenate([f[l][()] for l in default.get_dataset_location('P') if ph in [None,l.split('/')[2]]])
+                if per_phase:
+                    assert np.isclose(t.get(f'{prefix}fraction')[i],len(P)/default.N_materialpoints)
+                assert np.allclose(t.get(f'{prefix}mean(P)')[i],np.average(P,axis=0))
+                assert np.allclose(t.get(f'{prefix}min(P)')[i],np.min(P,axis=0))
+                assert np.allclose(t.get(f'{prefix}max(P)')[i],np.max(P,axis=0))
+                assert np.allclose(t.get(f'{prefix}percentile(P)')[i],np.percentile(P,[10,90],axis=0))
+                assert t.get(f'{prefix}histogram(P)')[i].sum() == P.size
+
+    def test_reduce_kinds(self,default):
+        F_max = default.reduce('F','max').get('max(F)')
+        with h5py.File(default.fname,'a') as f:
+            for inc in default.increments:
+                F = np.concatenate([f[inc]['phase'][ph]['mechanics/F'][()] for ph in f[inc]['phase']])
+                f[inc]['homogenization/SX/mech'].create_dataset('F',data=np.broadcast_to(np.eye(3),F.shape))
+                for a,v in f[inc]['phase/pheno_bcc/mechanics/F'].attrs.items():
+                    f[inc]['homogenization/SX/mech/F'].attrs[a] = v
+        r = Result(default.fname)
+        r.view('times',20.0)
+        t = r.reduce('F',['mean','max'])
+        assert np.allclose(t.get('homogenization/mean(F)'),np.eye(3))
+        assert not np.allclose(t.get('phase/mean(F)'),np.eye(3))
+        assert np.allclose(t.get('phase/max(F)'),F_max)
+
+    def test_reduce_missing(self,default):
+        default.view('increments',True)
+        with h5py.File(default.fname,'a') as f:
+            del f[f'{default.increments[0]}/phase/pheno_fcc/mechanics/P']
+        t = default.reduce('P',['mean','histogram'],per_phase=True,bins_range=(-1e9,1e9))
+        assert np.all(np.isnan(t.get('pheno_fcc/mean(P)')[0])) and t.get('pheno_fcc/fraction')[0] == 0
+        assert t.get('pheno_bcc/fraction')[0] == 1
+        assert not np.any(np.isnan(t.get('pheno_fcc/mean(P)')[1:]))
+
+    def test_reduce_invalid(self,default):
+        with pytest.raises(ValueError):
+            default.reduce('P','median')
+
+    @pytest.mark.parametrize('split',[True,False])
+    @pytest.mark.parametrize('datasets',['F',['P','F_p'],'xi_sl','O'])
+    @pytest.mark.parametrize('slab_length',[10,1000])
+    def test_place(self,default,split,datasets,slab_length):
+        default.view('increments',True)
+        default._slab_length = slab_length
+        placed = default.place(datasets,tagged=True,split=split)
+        tables = placed if split else {None:placed}
+        assert len(tables) == (len(default.visible['increments']) if split else 1)
+        for inc,t in tables.items():
+            for label in t.shapes:
+                path = label[:-2] if inc is None else '/'.join([inc,label[:-2]])
+                expected = default.read_dataset([path],plain=True)
+                assert np.allclose(t.get(label).reshape(expected.shape),expected,equal_nan=True)
+
     @pytest.mark.parametrize('mode',['cell','node'])
     def test_coordinates(self,default,mode):
          if   mode == 'cell':
@@ -368,6 +741,36 @@ class TestResult:
         os.chdir(tmp_path)
         default.save_VTK(output)
 
+    def test_vtk_parallel(self,tmp_path,default):
+        os.chdir(tmp_path)
+        default.view('increments',True)
+        for parallel in [False,True]:
+            os.mkdir(tmp_path/str(parallel))
+            os.chdir(tmp_path/str(parallel))
+            default.save_VTK(['F','P','xi_sl'],parallel=parallel)
+        join_writers()
+        fnames = sorted(os.listdir(tmp_path/'False'))
+        assert len(fnames) == len(default.visible['increments']) and fnames == sorted(os.listdir(tmp_path/'True'))
+        for fname in fnames:
+            a = VTK.load(tmp_path/'False'/fname)
+            b = VTK.load(tmp_path/'True'/fname)
+            for label in ['phase/mechanics/F / 1','phase/mechanics/P / Pa','u']:
+                assert np.array_equal(a.get(label),b.get(label),equal_nan=True)
+
+    @pytest.mark.parametrize('compress',[False,'lz4'])
+    @pytest.mark.parametrize('parallel',[False,True])
+    def test_vtk_pvd(self,tmp_path,single_phase,compress,parallel):
+        os.chdir(tmp_path)
+        single_phase.view('increments',True)
+        single_phase.save_VTK('F',parallel=parallel,pvd=True,compress=compress,appended=True)
+        join_writers()
+        datasets = ET.parse(single_phase.fname.with_suffix('.pvd').name).getroot().find('Collection')
+        assert np.allclose([float(d.get('timestep')) for d in datasets],single_phase.times)
+        for inc,d in zip(single_phase.visible['increments'],datasets):
+            single_phase.view('increments',inc)
+            F = single_phase.read_dataset(single_phase.get_dataset_location('F'))
+            assert np.allclose(VTK.load(d.get('file')).get('phase/mechanics/F / 1').reshape(-1,3,3),F)
+
     @pytest.mark.parametrize('mode',['point','cell'])
     def test_vtk_mode(self,tmp_path,single_phase,mode):
         os.chdir(tmp_path)
@@ -384,6 +787,50 @@ class TestResult:
             shutil.copy(tmp_path/fname,ref_path/fname)
         assert sorted(open(tmp_path/fname).read()) == sorted(open(ref_path/fname).read())           # XML is not ordered
 
+    def test_XDMF_multi_phase(self,tmp_path,default):
+        os.chdir(tmp_path)
+        default.save_XDMF()
+        reader = vtk.vtkXdmfReader()
+        reader.SetFileName(default.fname.with_suffix('.xdmf').name)
+        reader.UpdateInformation()
+        reader.UpdateTimeStep(default.times[-1])
+        cell_data = reader.GetOutputDataObject(0).GetCellData()
+        default.view('increments',default.increments[-1])
+        for label,name in [('F','phase/mechanics/F / 1'),('P','phase/mechanics/P / Pa'),('xi_sl','phase/plastic/xi_sl / Pa')]:
+            assert np.allclose(vtk_to_np(cell_data.GetArray(name)).reshape(default.N_materialpoints,-1),
+                               default.read_dataset(default.get_dataset_location(label)).reshape(default.N_materialpoints,-1))
+
     def test_XDMF_invalid(self,default):
+        default.structured = False
         with pytest.raises(TypeError):
             default.save_XDMF()
+
+    def test_save_DADF5(self,default,tmp_path):
+        default.view('phases','pheno_fcc')
+        default.save_DADF5(tmp_path/'subset.hdf5',['F','P'])
+        subset = Result(tmp_path/'subset.hdf5')
+        subset.view('phases','pheno_fcc')
+        assert subset.increments == default.visible['increments']
+        assert subset.get_dataset_location('F_p') == [] and subset.get_dataset_location('u_p') == []
+        for label in ['F','P']:
+            assert np.array_equal(subset.read_dataset(subset.get_dataset_location(label)),
+                                  default.read_dataset(default.get_dataset_location(label)),equal_nan=True)
+        subset.view('phases','pheno_bcc')
+        assert subset.get_dataset_location('F') == []
+
+    @pytest.mark.parametrize('selection',[(slice(1,5),slice(None,None,2),3),slice(2,3)])
+    def test_save_DADF5_selection(self,default,tmp_path,selection):
+        default.save_DADF5(tmp_path/'subset.hdf5',selection=selection)
+        subset = Result(tmp_path/'subset.hdf5')
+        subset.view('times',20.0)
+        assert np.allclose(grid_filters.coordinates0_point(subset.cells,subset.size,subset.origin),
+                           grid_filters.coordinates0_point(default.cells,default.size,default.origin)[selection] \
+                                                          .reshape(tuple(subset.cells)+(3,)))
+        for label in ['F','O','xi_sl']:
+            selected = subset.lazy_dataset(subset.get_dataset_location(label)).grid[:,:,:]
+            assert np.array_equal(selected,default.lazy_dataset(default.get_dataset_location(label)).grid[selection] \
+                                                                                                 .reshape(selected.shape))
+
+    def test_save_DADF5_invalid(self,default):
+        with pytest.raises(ValueError):
+            default.save_DADF5(default.fname)
@@ -40,6 +40,23 @@ class TestTable:
         d = default.get('5_F')
         assert np.allclose(d,1.0) and d.shape[1:] == (1,)
 
+    def test_get_view(self,default):
+        F = default.get('F')
+        assert np.shares_memory(F,default._data['F']) and not F.flags.writeable
+
+    def test_data_readonly(self,default):
+        with pytest.raises(ValueError):
+            default.data.iloc[0,0] = 2.0
+        assert default.data is default.data and np.allclose(default.get('F'),1.0)
+
+    def test_add_shared(self,default):
+        new = default.add('x',np.zeros((5,2)))
+        assert np.shares_memory(new._data['F'],default._data['F']) and 'x' not in default.shapes
+
+    def test_set_independent(self,default):
+        new = default.set('2_v',np.zeros(5))
+        assert np.allclose(default.get('v'),1.0) and np.allclose(new.get('2_v'),0.0)
+
     @pytest.mark.parametrize('N',[10,40])
     def test_getitem(self,N):
         assert len(Table(np.random.rand(N,1),{'X':1})[:N//2]) == N//2
@@ -67,6 +84,38 @@ class TestTable:
             new = Table.load(f)
         assert all(default.data==new.data) and default.shapes == new.shapes
 
+    @pytest.mark.parametrize('ext',['.npz','.parquet','.feather'])
+    @pytest.mark.parametrize('mmap',[True,False])
+    def test_write_read_binary(self,tmp_path,ext,mmap):
+        if ext != '.npz': pytest.importorskip('pyarrow')
+        t = Table(np.random.rand(5,13),{'F':(3,3),'v':(3,),'s':(1,)},['test data','random']) \
+            .add('phase/ID',np.arange(5))
+        t.save(tmp_path/f'default{ext}')
+        new = Table.load(tmp_path/f'default{ext}',mmap=mmap and ext != '.parquet')
+        assert all(new.data==t.data) and t.shapes == new.shapes and t.comments == new.comments
+        assert new.get('phase/ID').dtype == t.get('phase/ID').dtype
+
+    def test_read_feather_mmap(self,tmp_path):
+        pytest.importorskip('pyarrow')
+        t = Table(np.random.rand(5,4),{'v':(3,),'s':(1,)})
+        t.save(tmp_path/'default.feather')
+        new = Table.load(tmp_path/'default.feather',mmap=True)
+        assert not new._data['s'].flags.owndata and not new._data['s'].flags.writeable
+        assert np.allclose(new.get('s'),t.get('s')) and np.allclose(new.get('v'),t.get('v'))
+
+    @pytest.mark.parametrize('ext',['.txt','.npz','.parquet','.feather'])
+    @pytest.mark.parametrize('labels',['v',['s','F'],['phase/ID','v']])
+    def test_read_labels(self,tmp_path,ext,labels):
+        if ext in ['.parquet','.feather']: pytest.importorskip('pyarrow')
+        t = Table(np.random.rand(5,13),{'F':(3,3),'v':(3,),'s':(1,)}) \
+            .add('phase/ID',np.arange(5))
+        t.save(tmp_path/f'default{ext}')
+        new = Table.load(tmp_path/f'default{ext}',labels)
+        labels_ = [labels] if isinstance(labels,str) else labels
+        assert new.labels == labels_
+        for l in labels_:
+            assert np.allclose(new.get(l),t.get(l))
+
     def test_write_invalid_format(self,default,tmp_path):
         with pytest.raises(TypeError):
             default.save(tmp_path/'shouldnotbethere.txt',format='invalid')
@@ -86,6 +135,76 @@ class TestTable:
         assert new.data.shape == (4,10) and \
                new.labels == ['eu', 'pos', 'IQ', 'CI', 'ID', 'intensity', 'fit']
 
+    @pytest.mark.parametrize('chunksize',[1,3,10])
+    def test_read_ang_chunks(self,ref_path,chunksize):
+        chunks = list(Table.iter_load_ang(ref_path/'simple.ang',chunksize))
+        assert len(chunks) == -(-4//chunksize)
+        new = Table.load_ang(ref_path/'simple.ang')
+        assert np.allclose(np.vstack([c.data.to_numpy() for c in chunks]),new.data.to_numpy())
+
+    @pytest.mark.parametrize('suffix',['.txt','.npz','.parquet','.feather'])
+    @pytest.mark.parametrize('chunksize',[1,3,10])
+    @pytest.mark.parametrize('labels',[None,['v','s']])
+    def test_read_chunks(self,tmp_path,suffix,chunksize,labels):
+        if suffix in ['.parquet','.feather']: pytest.importorskip('pyarrow')
+        t = Table(np.random.rand(5,13),{'F':(3,3),'v':(3,),'s':(1,)},['random'])
+        t.save(tmp_path/f'default{suffix}')
+        chunks = list(Table.iter_load(tmp_path/f'default{suffix}',chunksize,labels))
+        assert len(chunks) == -(-5//chunksize)
+        for label in t.labels if labels is None else labels:
+            assert np.allclose(np.concatenate([c.get(label) for c in chunks]),t.get(label))
+        assert all(c.comments == t.comments for c in chunks)
+
+    @pytest.mark.parametrize('suffix',['.txt','.npz'])
+    @pytest.mark.parametrize('chunksize',[1,4,100])
+    def test_concatenate_files(self,tmp_path,suffix,chunksize):
+        t = [Table(np.random.rand(N,13),{'F':(3,3),'v':(3,),'s':(1,)},['random']) for N in [5,7]]
+        for i,t_ in enumerate(t): t_.save(tmp_path/f'{i}{suffix}')
+        Table.concatenate_files([tmp_path/f'{i}{suffix}' for i in range(2)],tmp_path/f'all{suffix}',chunksize)
+        a = Table.load(tmp_path/f'all{suffix}')
+        assert len(a) == 12 and np.allclose(a.data,t[0].append(t[1]).data)
+
+    @pytest.mark.parametrize('suffix',['.txt','.npz','.parquet','.feather'])
+    @pytest.mark.parametrize('chunksize',[1,4,100])
+    def test_concatenate_files_promote(self,tmp_path,suffix,chunksize):
+        if suffix in ['.parquet','.feather']: pytest.importorskip('pyarrow')
+        t = [Table({'n':np.arange(N)+o,'b':np.arange(N)%2==0},{'n':(1,),'b':(1,)}) for N,o in [(5,0),(7,.5)]]
+        for i,t_ in enumerate(t): t_.save(tmp_path/f'{i}.npz')
+        Table.concatenate_files([tmp_path/f'{i}.npz' for i in range(2)],tmp_path/f'all{suffix}',chunksize)
+        a = Table.load(tmp_path/f'all{suffix}')
+        assert np.allclose(a.get('n'),t[0].append(t[1]).get('n')) and a.get('n').dtype == np.float64
+
+    def test_concatenate_files_invalid(self,tmp_path):
+        Table(np.random.rand(5,3),{'v':(3,)}).save(tmp_path/'0.txt')
+        Table(np.random.rand(5,3),{'x':(3,)}).save(tmp_path/'1.txt')
+        with pytest.raises(KeyError):
+            Table.concatenate_files([tmp_path/'0.txt',tmp_path/'1.txt'],tmp_path/'all.txt')
+
+    @pytest.mark.parametrize('suffix',['.txt','.npz'])
+    @pytest.mark.parametrize('chunksize',[1,3,10,1000])
+    @pytest.mark.parametrize('ascending',[True,False])
+    def test_sort_files(self,tmp_path,suffix,chunksize,ascending):
+        t = [Table(np.random.rand(N,4),{'s':(1,),'v':(3,)}) for N in [50,31]]
+        t[0] = t[0].set('v',np.random.randint(0,3,(50,3)))
+        t[1] = t[1].set('v',np.random.randint(0,3,(31,3)))
+        for i,t_ in enumerate(t): t_.save(tmp_path/f'{i}{suffix}')
+        Table.sort_files([tmp_path/f'{i}{suffix}' for i in range(2)],tmp_path/f'sorted{suffix}',
+                         ['1_v','s'],ascending,chunksize)
+        s = Table.load(tmp_path/f'sorted{suffix}')
+        assert np.allclose(s.data,t[0].append(t[1]).sort_by(['1_v','s'],ascending).data)
+
+    @pytest.mark.parametrize('chunksize',[1,3,1000])
+    def test_sort_files_descending_int(self,tmp_path,chunksize):
+        t = Table({'i':2**62+np.random.permutation(20)},{'i':(1,)})
+        t.save(tmp_path/'0.npz')
+        Table.sort_files(tmp_path/'0.npz',tmp_path/'sorted.npz','i',False,chunksize)
+        assert np.array_equal(Table.load(tmp_path/'sorted.npz').get('i'),t.sort_by('i',False).get('i'))
+
+    def test_sort_files_descending_str(self,tmp_path):
+        Table({'s':np.array(['b','a','c'])},{'s':(1,)}).save(tmp_path/'0.npz')
+        with pytest.raises(TypeError):
+            Table.sort_files(tmp_path/'0.npz',tmp_path/'sorted.npz','s',False)
+
     @pytest.mark.parametrize('fname',['datatype-mix.txt','whitespace-mix.txt'])
     def test_read_strange(self,ref_path,fname):
         with open(ref_path/fname) as f:
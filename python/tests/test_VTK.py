@@ -94,6 +94,20 @@ class TestVTK:
         assert(VTK.load(fname_c).__repr__() == VTK.load(fname_p).__repr__())
 
 
+    @pytest.mark.parametrize('compress',[False,True,'lz4','lzma'])
+    @pytest.mark.parametrize('appended',[False,True])
+    def test_compress_appended(self,tmp_path,compress,appended):
+        points = np.random.rand(102,3)
+        v = VTK.from_poly_data(points)
+        v.add(np.random.rand(102,3,3),'T')
+        v.save(tmp_path/'a.vtp',parallel=False,compress=compress,appended=appended)
+        assert np.allclose(VTK.load(tmp_path/'a.vtp').get('T').reshape(-1,3,3),v.get('T').reshape(-1,3,3))
+
+    def test_invalid_compress(self,tmp_path):
+        v = VTK.from_poly_data(np.random.rand(102,3))
+        with pytest.raises(ValueError):
+            v.save(tmp_path/'a.vtp',parallel=False,compress='gzip')
+
     @pytest.mark.parametrize('fname',['a','a.vtp','a.b','a.b.vtp'])
     def test_filename_variations(self,tmp_path,fname):
         points = np.random.rand(102,3)